@@ -0,0 +1,145 @@
+"""
+Shared PDB Parse Cache
+Parses a PDB file once into structure-of-arrays NumPy data and memoizes
+the result as an .npz file next to the source, keyed by file mtime.
+Used by detect_grid.py and interaction_analysis.py so repeated calls
+against the same receptor skip the BioPython parse entirely.
+"""
+
+import os
+import sys
+import numpy as np
+from Bio.PDB import PDBParser
+
+
+def load_pdb_arrays(pdb_path: str) -> dict:
+    """
+    Load structure-of-arrays data for a PDB file, using the npz cache
+    when it is newer than the source file
+
+    Args:
+        pdb_path: Path to PDB file
+
+    Returns:
+        Dictionary of parallel arrays:
+            coords:     (N, 3) float32 atom coordinates
+            elements:   (N,) element symbols (uppercase, stripped)
+            atom_names: (N,) atom names
+            resnames:   (N,) residue names
+            res_ids:    (N,) int32 residue sequence numbers
+            is_het:     (N,) bool, True for HETATM (non-blank residue id)
+    """
+    cache_path = pdb_path + '.npz'
+
+    try:
+        if (os.path.exists(cache_path)
+                and os.path.getmtime(cache_path) >= os.path.getmtime(pdb_path)):
+            with np.load(cache_path) as cached:
+                return {key: cached[key] for key in cached.files}
+    except Exception as e:
+        print(f"[PDB Cache] Ignoring stale cache {cache_path}: {e}", file=sys.stderr)
+
+    arrays = _parse_pdb_arrays(pdb_path)
+
+    try:
+        np.savez(cache_path, **arrays)
+    except Exception as e:
+        # Cache write failure is non-fatal (e.g. read-only directory)
+        print(f"[PDB Cache] Could not write cache {cache_path}: {e}", file=sys.stderr)
+
+    return arrays
+
+
+def _parse_pdb_arrays(pdb_path: str) -> dict:
+    """
+    Parse a PDB into parallel NumPy arrays
+
+    Tries the fixed-column parser first (one slice pass per record, bulk
+    NumPy conversion, no per-atom Python objects); falls back to the
+    BioPython parser for anything the column parser cannot handle.
+    """
+    try:
+        return _parse_pdb_columns(pdb_path)
+    except Exception as e:
+        print(f"[PDB Cache] Column parse failed ({e}), using BioPython", file=sys.stderr)
+        return _parse_pdb_biopython(pdb_path)
+
+
+def _parse_pdb_columns(pdb_path: str) -> dict:
+    """Fixed-column PDB parse straight into NumPy arrays"""
+    records = []
+    with open(pdb_path, 'rb') as handle:
+        for line in handle:
+            # Keep first altloc only, matching BioPython's default selection
+            if line.startswith((b'ATOM  ', b'HETATM')) and line[16:17] in (b' ', b'A'):
+                records.append(line.ljust(80))
+
+    if not records:
+        raise ValueError('no ATOM/HETATM records')
+
+    # NumPy converts the raw byte slices to numbers in bulk - the only
+    # per-record Python work is the column slicing itself
+    coords = np.array(
+        [(line[30:38], line[38:46], line[46:54]) for line in records],
+        dtype=np.float32
+    )
+    res_ids = np.array([line[22:26] for line in records], dtype=np.int32)
+
+    atom_names = []
+    elements = []
+    for line in records:
+        name = line[12:16].strip().decode()
+        atom_names.append(name)
+        elem = line[76:78].strip().decode().upper()
+        if not elem:
+            # Element columns absent (e.g. minimal Vina output): infer
+            # from the atom name the way BioPython does
+            elem = name.lstrip('0123456789')[:1].upper()
+        elements.append(elem)
+
+    return {
+        'coords': coords,
+        'elements': np.array(elements, dtype='U2'),
+        'atom_names': np.array(atom_names, dtype='U6'),
+        'resnames': np.array(
+            [line[17:20].strip().decode() for line in records], dtype='U3'
+        ),
+        'res_ids': res_ids,
+        'is_het': np.array(
+            [line.startswith(b'HETATM') for line in records], dtype=bool
+        )
+    }
+
+
+def _parse_pdb_biopython(pdb_path: str) -> dict:
+    """Parse a PDB with BioPython into parallel NumPy arrays"""
+    parser = PDBParser(QUIET=True)
+    structure = parser.get_structure('structure', pdb_path)
+
+    coords = []
+    elements = []
+    atom_names = []
+    resnames = []
+    res_ids = []
+    is_het = []
+
+    for residue in structure.get_residues():
+        het = residue.id[0] != ' '
+        resname = residue.resname
+        res_id = residue.id[1]
+        for atom in residue:
+            coords.append(atom.coord)
+            elements.append(atom.element.strip().upper())
+            atom_names.append(atom.name)
+            resnames.append(resname)
+            res_ids.append(res_id)
+            is_het.append(het)
+
+    return {
+        'coords': np.array(coords, dtype=np.float32).reshape(-1, 3),
+        'elements': np.array(elements, dtype='U2'),
+        'atom_names': np.array(atom_names, dtype='U6'),
+        'resnames': np.array(resnames, dtype='U3'),
+        'res_ids': np.array(res_ids, dtype=np.int32),
+        'is_het': np.array(is_het, dtype=bool)
+    }
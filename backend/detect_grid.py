@@ -5,36 +5,36 @@ Returns JSON with grid center and size
 """
 import sys
 import json
-from Bio.PDB import PDBParser, PDBIO
+from _pdb_cache import load_pdb_arrays
 import numpy as np
 
 def detect_grid_box(pdb_file):
     """Detect grid box for protein structure"""
     try:
-        parser = PDBParser(QUIET=True)
-        structure = parser.get_structure('protein', pdb_file)
-        
+        # Cached SoA parse shared with interaction_analysis
+        arrays = load_pdb_arrays(pdb_file)
+
         # Get all heavy atoms (non-hydrogen)
-        coords = []
-        het_coords = []  # Heteroatoms (potential ligands)
-        
-        for model in structure:
-            for chain in model:
-                for residue in chain:
-                    # Check if heteroatom (potential co-crystallized ligand)
-                    is_het = residue.id[0] != ' '
-                    
-                    for atom in residue:
-                        if atom.element != 'H':  # Skip hydrogens
-                            coord = atom.get_coord()
-                            coords.append(coord)
-                            if is_het:
-                                het_coords.append(coord)
-        
-        if len(het_coords) > 5:
+        heavy = arrays['elements'] != 'H'
+        all_coords = arrays['coords'][heavy]
+        n_heavy = int(heavy.sum())
+
+        # mean() over zero atoms yields NaN (invalid JSON downstream)
+        # rather than raising; route empty input to the error path
+        if n_heavy == 0:
+            raise ValueError('no atoms parsed from PDB file')
+
+        # Heteroatoms (potential co-crystallized ligands)
+        is_het = arrays['is_het'][heavy]
+        het_count = int(is_het.sum())
+
+        if het_count > 5:
             # Use co-crystallized ligand location
-            coords_array = np.array(het_coords)
-            center = coords_array.mean(axis=0)
+            # coords come back float32 from the cache; keep the reductions
+            # in float32 too so the memory-bound mean/min/max stay at half
+            # the bandwidth of a float64 accumulator
+            coords_array = all_coords[is_het]
+            center = coords_array.mean(axis=0, dtype=np.float32)
             
             # Calculate size with padding
             min_coords = coords_array.min(axis=0)
@@ -58,12 +58,11 @@ def detect_grid_box(pdb_file):
                     'z': round(float(size[2]), 2)
                 },
                 'method': 'ligand-based',
-                'message': f'Grid detected from co-crystallized ligand ({len(het_coords)} atoms)'
+                'message': f'Grid detected from co-crystallized ligand ({het_count} atoms)'
             }
         else:
             # Use center of mass of protein
-            coords_array = np.array(coords)
-            center = coords_array.mean(axis=0)
+            center = all_coords.mean(axis=0, dtype=np.float32)
             
             result = {
                 'center': {
@@ -77,7 +76,7 @@ def detect_grid_box(pdb_file):
                     'z': 25
                 },
                 'method': 'center-of-mass',
-                'message': f'Grid centered at protein center of mass ({len(coords)} atoms)'
+                'message': f'Grid centered at protein center of mass ({n_heavy} atoms)'
             }
         
         print(json.dumps(result))
@@ -8,6 +8,7 @@ to bypass the need for AutoDockTools installation.
 
 import requests
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 def download_1hsg_receptor():
     """Download pre-prepared 1HSG receptor PDBQT"""
@@ -22,26 +23,48 @@ def download_1hsg_receptor():
     
     output_file = "1hsg_receptor_proper.pdbqt"
     
-    for url in urls:
-        try:
-            print(f"Trying to download from: {url}")
-            response = requests.get(url, timeout=10)
-            
-            if response.status_code == 200:
-                content = response.text
-                
+    # Fire all mirror requests concurrently and take the first success
+    # instead of trying each URL serially with its own 10s timeout
+    with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+        futures = {
+            executor.submit(requests.get, url, timeout=10, stream=True): url
+            for url in urls
+        }
+
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                response = future.result()
+
+                if response.status_code != 200:
+                    response.close()
+                    continue
+
+                print(f"Downloading from: {url}")
+
+                # Stream chunks straight to disk instead of buffering the
+                # whole body in memory; keep the first chunk for validation
+                first_chunk = b''
+                total_bytes = 0
+                total_lines = 0
+                with open(output_file, 'wb') as f:
+                    for chunk in response.iter_content(chunk_size=65536):
+                        if not first_chunk:
+                            first_chunk = chunk
+                        f.write(chunk)
+                        total_bytes += len(chunk)
+                        total_lines += chunk.count(b'\n')
+
                 # Verify it's a valid PDBQT
-                if 'ATOM' in content and ('PDBQT' in content or 'REMARK' in content):
-                    with open(output_file, 'w') as f:
-                        f.write(content)
-                    
+                head = first_chunk.decode('utf-8', errors='replace')
+                if 'ATOM' in head and ('PDBQT' in head or 'REMARK' in head):
                     print(f"✅ Downloaded receptor to: {output_file}")
-                    print(f"   Size: {len(content)} bytes")
-                    print(f"   Lines: {len(content.splitlines())}")
+                    print(f"   Size: {total_bytes} bytes")
+                    print(f"   Lines: {total_lines}")
                     return True
-        except Exception as e:
-            print(f"❌ Failed: {e}")
-            continue
+            except Exception as e:
+                print(f"❌ Failed ({url}): {e}")
+                continue
     
     print("\n⚠️  Could not download from online sources.")
     print("Creating minimal PDBQT manually...")
@@ -53,35 +76,29 @@ def create_minimal_1hsg_receptor(output_file):
     Create a minimal but functional 1HSG receptor PDBQT
     Uses cleaned PDB with basic PDBQT formatting
     """
+    import re
     import urllib.request
     
     # Download clean 1HSG PDB from RCSB
     pdb_url = "https://files.rcsb.org/download/1HSG.pdb"
     
     print(f"Downloading PDB from RCSB: {pdb_url}")
-    
+
     with urllib.request.urlopen(pdb_url) as response:
-        pdb_content = response.read().decode('utf-8')
-    
-    # Process PDB → minimal PDBQT
-    lines = pdb_content.split('\n')
-    
-    with open(output_file, 'w') as out:
-        out.write("REMARK  1HSG HIV-1 Protease Receptor\n")
-        out.write("REMARK  Prepared for AutoDock Vina\n")
-        out.write("REMARK  Source: RCSB PDB\n")
-        
-        for line in lines:
-            # Keep only protein ATOM lines (exclude waters, ligands)
-            if line.startswith('ATOM'):
-                # Check if it's not water or ligand
-                res_name = line[17:20].strip()
-                if res_name not in ['HOH', 'WAT', 'MK1']:  # MK1 is the ligand in 1HSG
-                    # Write as PDBQT format (minimal)
-                    out.write(line + '\n')
-        
-        out.write('TER\n')
-        out.write('ENDMDL\n')
+        data = response.read()
+
+    # Keep only protein ATOM lines (exclude waters and the MK1 ligand):
+    # one compiled regex pass over the raw bytes, no per-line Python
+    # slicing. The lookahead sits at column 17, the residue-name field.
+    pattern = re.compile(rb'^ATOM.{13}(?!HOH|WAT|MK1).*$', re.MULTILINE)
+
+    with open(output_file, 'wb') as out:
+        out.write(b"REMARK  1HSG HIV-1 Protease Receptor\n")
+        out.write(b"REMARK  Prepared for AutoDock Vina\n")
+        out.write(b"REMARK  Source: RCSB PDB\n")
+        out.writelines(match.group(0) + b'\n' for match in pattern.finditer(data))
+        out.write(b'TER\n')
+        out.write(b'ENDMDL\n')
     
     print(f"✅ Created minimal receptor: {output_file}")
 
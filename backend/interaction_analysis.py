@@ -6,10 +6,157 @@ Uses BioPython and geometric calculations
 
 import sys
 import numpy as np
-from Bio.PDB import PDBParser, Selection
+from _pdb_cache import load_pdb_arrays
 from typing import Dict, List, Tuple
 import math
 
+# Numba is optional - the JIT kernels fall back to NumPy if absent
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+# CuPy is optional - only consulted for very large candidate sets
+# (whole-pocket scans); everything else stays on the CPU path
+try:
+    import cupy as cp
+except ImportError:
+    cp = None
+
+# Candidate-pair count above which the distance pass moves to the GPU
+# when CuPy is available; below this, host<->device transfer dominates
+GPU_PAIR_THRESHOLD = 5_000_000
+
+# Residue-class bit flags (see InteractionAnalyzer residue sets)
+HYDROPHOBIC_BIT = 1
+AROMATIC_BIT = 2
+POSITIVE_BIT = 4
+NEGATIVE_BIT = 8
+
+# Interaction type codes returned by the classification kernel
+HBOND_CODE = 1
+HYDROPHOBIC_CODE = 2
+PI_STACKING_CODE = 3
+IONIC_CODE = 4
+
+# Squared cutoffs (Å²): the kernels compare squared distances so the
+# sqrt is deferred to the accepted pairs only
+HBOND_DIST2 = 3.5 ** 2
+HYDROPHOBIC_DIST2 = 4.0 ** 2
+PI_STACKING_DIST2 = 6.0 ** 2
+
+# Candidate-generation cutoff and cell-list bin size. With 6 Å cells a
+# ligand atom's 27 surrounding cells are guaranteed to contain every
+# protein atom within the contact cutoff
+CONTACT_DISTANCE = 6.0
+CONTACT_DIST2 = CONTACT_DISTANCE ** 2
+
+
+def _build_resname_flags(hydrophobic, aromatic, positive, negative):
+    """Precompute the residue-name -> bit-flag lookup table"""
+    flags = {}
+    for name in hydrophobic | aromatic | positive | negative:
+        flags[name] = (
+            (HYDROPHOBIC_BIT if name in hydrophobic else 0)
+            | (AROMATIC_BIT if name in aromatic else 0)
+            | (POSITIVE_BIT if name in positive else 0)
+            | (NEGATIVE_BIT if name in negative else 0)
+        )
+    return flags
+
+
+def _classify_pairs_numpy(dist2, lig_elem, prot_elem, prot_flags):
+    """
+    Vectorized fallback classification over candidate pairs
+
+    Args:
+        dist2: (M,) squared pair distances
+        lig_elem: (M,) int8 ligand element codes (C=1, N=2, O=3, S=4)
+        prot_elem: (M,) int8 protein element codes
+        prot_flags: (M,) uint8 residue-class bit flags
+
+    Returns:
+        (M,) int8 interaction codes (0 = no interaction)
+    """
+    codes = np.zeros(dist2.shape[0], dtype=np.int8)
+
+    # Shared subexpressions evaluated once; a running 'unclaimed' mask
+    # reproduces the elif chain (first match wins) in a single fused pass
+    lig_carbon = lig_elem == 1
+    within_4 = dist2 <= HYDROPHOBIC_DIST2
+    unclaimed = np.ones(dist2.shape[0], dtype=bool)
+
+    hbond = (dist2 <= HBOND_DIST2) & (lig_elem >= 2) & (prot_elem >= 2)
+    codes[hbond] = HBOND_CODE
+    unclaimed &= ~hbond
+
+    hydrophobic = (
+        unclaimed & within_4 & lig_carbon & (prot_elem == 1)
+        & ((prot_flags & HYDROPHOBIC_BIT) != 0)
+    )
+    codes[hydrophobic] = HYDROPHOBIC_CODE
+    unclaimed &= ~hydrophobic
+
+    pi_stacking = (
+        unclaimed & (dist2 <= PI_STACKING_DIST2) & lig_carbon
+        & ((prot_flags & AROMATIC_BIT) != 0)
+    )
+    codes[pi_stacking] = PI_STACKING_CODE
+    unclaimed &= ~pi_stacking
+
+    ionic = (
+        unclaimed & within_4
+        & ((((prot_flags & POSITIVE_BIT) != 0) & (lig_elem == 3))
+           | (((prot_flags & NEGATIVE_BIT) != 0) & (lig_elem == 2)))
+    )
+    codes[ionic] = IONIC_CODE
+    return codes
+
+
+if njit is not None:
+    # nogil + fastmath give the JIT kernels C-extension behavior: the GIL
+    # is released for the duration of the loop and the compiler is free
+    # to reorder/fuse the float math (no NaN semantics needed here)
+    @njit(cache=True, nogil=True, fastmath=True)
+    def _classify_pairs_numba(dist2, lig_elem, prot_elem, prot_flags):
+        codes = np.zeros(dist2.shape[0], dtype=np.int8)
+        for k in range(dist2.shape[0]):
+            d2 = dist2[k]
+            le = lig_elem[k]
+            pe = prot_elem[k]
+            flags = prot_flags[k]
+            if d2 <= HBOND_DIST2 and le >= 2 and pe >= 2:
+                codes[k] = HBOND_CODE
+            elif d2 <= HYDROPHOBIC_DIST2 and le == 1 and pe == 1 and flags & HYDROPHOBIC_BIT:
+                codes[k] = HYDROPHOBIC_CODE
+            elif d2 <= PI_STACKING_DIST2 and le == 1 and flags & AROMATIC_BIT:
+                codes[k] = PI_STACKING_CODE
+            elif d2 <= HYDROPHOBIC_DIST2 and ((flags & POSITIVE_BIT and le == 3)
+                                              or (flags & NEGATIVE_BIT and le == 2)):
+                codes[k] = IONIC_CODE
+        return codes
+
+    @njit(cache=True, parallel=True, nogil=True, fastmath=True)
+    def _candidate_sqdists_numba(lig_coords, prot_coords, lig_idx, prot_idx):
+        # Threads each handle a slice of the candidate pairs; sqrt is
+        # deferred to the accepted pairs in analyze()
+        n = lig_idx.shape[0]
+        dist2 = np.empty(n, dtype=np.float64)
+        for k in prange(n):
+            li = lig_idx[k]
+            pi = prot_idx[k]
+            dx = np.float64(lig_coords[li, 0]) - np.float64(prot_coords[pi, 0])
+            dy = np.float64(lig_coords[li, 1]) - np.float64(prot_coords[pi, 1])
+            dz = np.float64(lig_coords[li, 2]) - np.float64(prot_coords[pi, 2])
+            dist2[k] = dx * dx + dy * dy + dz * dz
+        return dist2
+
+    _classify_pairs = _classify_pairs_numba
+else:
+    _candidate_sqdists_numba = None
+    _classify_pairs = _classify_pairs_numpy
+
 
 class InteractionAnalyzer:
     """
@@ -37,34 +184,141 @@ class InteractionAnalyzer:
     # Hydrogen bond donor/acceptor atoms
     HBOND_DONORS = {'N', 'O'}  # Can donate H
     HBOND_ACCEPTORS = {'N', 'O', 'S'}  # Can accept H
-    
-    def __init__(self, complex_pdb_path: str):
+
+    # Integer element codes for vectorized classification (0 = other)
+    ELEMENT_CODES = {'C': 1, 'N': 2, 'O': 3, 'S': 4}
+
+    # Residue-name -> uint8 bit-flag table (one hash lookup per atom at
+    # init time instead of four set-membership tests per candidate pair)
+    RESNAME_FLAGS = _build_resname_flags(
+        HYDROPHOBIC_RESIDUES, AROMATIC_RESIDUES,
+        POSITIVE_RESIDUES, NEGATIVE_RESIDUES
+    )
+
+    def __init__(self, complex_pdb_path: str = None, receptor_pdb_path: str = None):
         """
         Initialize analyzer with protein-ligand complex
-        
+
         Args:
             complex_pdb_path: Path to PDB file containing protein and ligand
+            receptor_pdb_path: Path to receptor-only PDB; pair with
+                set_ligand() to analyze multiple poses against one receptor
         """
-        self.parser = PDBParser(QUIET=True)
-        self.structure = self.parser.get_structure('complex', complex_pdb_path)
-        
-        # Separate protein and ligand
-        self.protein_atoms = []
-        self.ligand_atoms = []
-        
-        for model in self.structure:
-            for chain in model:
-                for residue in chain:
-                    atoms = list(residue.get_atoms())
-                    # HETATM records are typically ligands
-                    if residue.id[0].strip() == '':  # Standard amino acids
-                        self.protein_atoms.extend(atoms)
-                    else:  # HETATM
-                        self.ligand_atoms.extend(atoms)
-        
-        print(f"[Interaction Analysis] Protein atoms: {len(self.protein_atoms)}", file=sys.stderr)
-        print(f"[Interaction Analysis] Ligand atoms: {len(self.ligand_atoms)}", file=sys.stderr)
-    
+        # Cached SoA parse: arrays come back from the npz cache when the
+        # same file was analyzed before (common when screening many poses)
+        if complex_pdb_path is not None:
+            arrays = load_pdb_arrays(complex_pdb_path)
+            # Separate protein and ligand (HETATM records are typically ligands)
+            het = arrays['is_het']
+            self._set_protein(arrays, ~het)
+            self._set_ligand(arrays, het)
+        elif receptor_pdb_path is not None:
+            arrays = load_pdb_arrays(receptor_pdb_path)
+            self._set_protein(arrays, ~arrays['is_het'])
+            self._set_ligand(arrays, np.zeros(len(arrays['is_het']), dtype=bool))
+        else:
+            raise ValueError('complex_pdb_path or receptor_pdb_path is required')
+
+    def _set_protein(self, arrays: dict, mask: np.ndarray):
+        """Extract protein arrays and build the cell list (done once)"""
+        self.prot_coords = np.ascontiguousarray(arrays['coords'][mask])
+        self.prot_elem = self._element_codes(arrays['elements'][mask])
+        self.prot_res_flags = self._residue_flags(arrays['resnames'][mask])
+        self.prot_atom_names = arrays['atom_names'][mask]
+        self.prot_resnames = arrays['resnames'][mask]
+        self.prot_res_ids = arrays['res_ids'][mask]
+
+        # Cell list over protein coords so only atoms near the ligand are
+        # scanned: O(N) to build, O(1) neighbor lookup per ligand atom
+        self._build_cell_list()
+
+        print(f"[Interaction Analysis] Protein atoms: {len(self.prot_coords)}", file=sys.stderr)
+
+    def _set_ligand(self, arrays: dict, mask: np.ndarray):
+        """Extract ligand arrays; protein arrays and cell list are untouched"""
+        self.lig_coords = np.ascontiguousarray(arrays['coords'][mask])
+        self.lig_elem = self._element_codes(arrays['elements'][mask])
+        self.lig_atom_names = arrays['atom_names'][mask]
+
+        print(f"[Interaction Analysis] Ligand atoms: {len(self.lig_coords)}", file=sys.stderr)
+
+    def set_ligand(self, ligand_pdb_path: str):
+        """
+        Load a new ligand pose against the already-parsed receptor
+
+        Args:
+            ligand_pdb_path: Path to ligand-only PDB (one docked pose)
+        """
+        arrays = load_pdb_arrays(ligand_pdb_path)
+        het = arrays['is_het']
+        if not het.any():
+            # Pose files sometimes write the ligand as ATOM records
+            het = np.ones(len(het), dtype=bool)
+        self._set_ligand(arrays, het)
+
+    def _element_codes(self, elements) -> np.ndarray:
+        """Encode element symbols as int8 codes (see ELEMENT_CODES)"""
+        codes = self.ELEMENT_CODES
+        return np.array([codes.get(e, 0) for e in elements], dtype=np.int8)
+
+    def _residue_flags(self, resnames) -> np.ndarray:
+        """Encode residue classes as uint8 bit flags per atom"""
+        flags_table = self.RESNAME_FLAGS
+        return np.array([flags_table.get(r, 0) for r in resnames], dtype=np.uint8)
+
+    def _build_cell_list(self):
+        """
+        Bin protein atoms into a 6 Å spatial grid for candidate lookup
+
+        Bin assignment and grouping are fully vectorized: atoms are sorted
+        by flattened cell index once and the sorted order split at cell
+        boundaries, so no per-atom Python loop runs at init time.
+        """
+        if not len(self.prot_coords):
+            self._cells = {}
+            self._cell_origin = np.zeros(3, dtype=np.float32)
+            return
+
+        self._cell_origin = self.prot_coords.min(axis=0)
+        cell_idx = np.floor(
+            (self.prot_coords - self._cell_origin) / CONTACT_DISTANCE
+        ).astype(np.int64)
+        self._grid_shape = cell_idx.max(axis=0) + 1
+        ny = int(self._grid_shape[1])
+        nz = int(self._grid_shape[2])
+        flat = (cell_idx[:, 0] * ny + cell_idx[:, 1]) * nz + cell_idx[:, 2]
+
+        order = np.argsort(flat, kind='stable')
+        sorted_flat = flat[order]
+        boundaries = np.nonzero(np.diff(sorted_flat))[0] + 1
+        starts = np.concatenate(([0], boundaries))
+        self._cells = dict(zip(
+            sorted_flat[starts].tolist(),
+            np.split(order, boundaries)
+        ))
+
+    def _nearby_prot_indices(self, coord) -> np.ndarray:
+        """Protein atom indices in the 27 cells around a ligand atom"""
+        cx, cy, cz = np.floor(
+            (coord - self._cell_origin) / CONTACT_DISTANCE
+        ).astype(np.int64)
+        nx = int(self._grid_shape[0])
+        ny = int(self._grid_shape[1])
+        nz = int(self._grid_shape[2])
+
+        hits = []
+        for ix in range(max(cx - 1, 0), min(cx + 2, nx)):
+            for iy in range(max(cy - 1, 0), min(cy + 2, ny)):
+                base = (ix * ny + iy) * nz
+                for iz in range(max(cz - 1, 0), min(cz + 2, nz)):
+                    group = self._cells.get(base + iz)
+                    if group is not None:
+                        hits.append(group)
+
+        if not hits:
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate(hits).astype(np.intp)
+
     def distance(self, atom1, atom2) -> float:
         """Calculate Euclidean distance between two atoms"""
         return np.linalg.norm(atom1.coord - atom2.coord)
@@ -115,9 +369,9 @@ class InteractionAnalyzer:
         # Both should be carbon atoms
         if elem_res == 'C' and elem_lig == 'C':
             # Residue should be hydrophobic
-            if residue.resname in self.HYDROPHOBIC_RESIDUES:
+            if self.RESNAME_FLAGS.get(residue.resname, 0) & HYDROPHOBIC_BIT:
                 return True
-        
+
         return False
     
     def is_pi_stacking(self, res_atom, lig_atom, distance: float) -> bool:
@@ -135,9 +389,9 @@ class InteractionAnalyzer:
         residue = res_atom.get_parent()
         elem_lig = lig_atom.element.strip().upper()
         
-        if residue.resname in self.AROMATIC_RESIDUES and elem_lig == 'C':
+        if self.RESNAME_FLAGS.get(residue.resname, 0) & AROMATIC_BIT and elem_lig == 'C':
             return True
-        
+
         return False
     
     def is_ionic_interaction(self, res_atom, lig_atom, distance: float) -> bool:
@@ -157,13 +411,14 @@ class InteractionAnalyzer:
         elem_lig = lig_atom.element.strip().upper()
         
         # Positive residue + negatively charged ligand atom
-        if residue.resname in self.POSITIVE_RESIDUES and elem_lig == 'O':
+        res_flags = self.RESNAME_FLAGS.get(residue.resname, 0)
+        if res_flags & POSITIVE_BIT and elem_lig == 'O':
             return True
-        
+
         # Negative residue + positively charged ligand atom
-        if residue.resname in self.NEGATIVE_RESIDUES and elem_lig == 'N':
+        if res_flags & NEGATIVE_BIT and elem_lig == 'N':
             return True
-        
+
         return False
     
     def analyze(self) -> Dict:
@@ -183,61 +438,84 @@ class InteractionAnalyzer:
         
         # Track unique residues for summary
         interacting_residues = set()
-        
-        # Analyze each ligand atom against all protein atoms
-        for lig_atom in self.ligand_atoms:
-            for prot_atom in self.protein_atoms:
-                distance = self.distance(lig_atom, prot_atom)
-                
-                # Skip if too far
-                if distance > 6.0:
-                    continue
-                
-                residue_name = self.get_residue_name(prot_atom)
-                interacting_residues.add(residue_name)
-                
-                # Check hydrogen bond
-                if self.is_hydrogen_bond(prot_atom, lig_atom, distance):
-                    interactions['hBonds'].append({
-                        'residue': residue_name,
-                        'proteinAtom': prot_atom.name,
-                        'ligandAtom': lig_atom.name,
-                        'distance': float(round(distance, 2))  # Convert to Python float
-                    })
-                
-                # Check hydrophobic interaction
-                elif self.is_hydrophobic_interaction(prot_atom, lig_atom, distance):
-                    interactions['hydrophobic'].append({
-                        'residue': residue_name,
-                        'proteinAtom': prot_atom.name,
-                        'ligandAtom': lig_atom.name,
-                        'distance': float(round(distance, 2))  # Convert to Python float
-                    })
-                
-                # Check π-π stacking
-                elif self.is_pi_stacking(prot_atom, lig_atom, distance):
-                    interactions['piStacking'].append({
-                        'residue': residue_name,
-                        'proteinAtom': prot_atom.name,
-                        'ligandAtom': lig_atom.name,
-                        'distance': float(round(distance, 2))  # Convert to Python float
-                    })
-                
-                # Check ionic interaction
-                elif self.is_ionic_interaction(prot_atom, lig_atom, distance):
-                    interactions['ionic'].append({
-                        'residue': residue_name,
-                        'proteinAtom': prot_atom.name,
-                        'ligandAtom': lig_atom.name,
-                        'distance': float(round(distance, 2))  # Convert to Python float
-                    })
-        
-        # Remove duplicates and summarize
-        interactions['hBonds'] = self._deduplicate_interactions(interactions['hBonds'])
-        interactions['hydrophobic'] = self._deduplicate_interactions(interactions['hydrophobic'])
-        interactions['piStacking'] = self._deduplicate_interactions(interactions['piStacking'])
-        interactions['ionic'] = self._deduplicate_interactions(interactions['ionic'])
-        
+
+        # Look up each ligand atom's 27 surrounding cells in the protein
+        # cell list — avoids computing distances to the bulk of the protein
+        if self._cells and len(self.lig_coords):
+            neighbor_lists = [
+                self._nearby_prot_indices(coord) for coord in self.lig_coords
+            ]
+            lig_idx = np.repeat(
+                np.arange(len(neighbor_lists)),
+                [len(neighbors) for neighbors in neighbor_lists]
+            )
+            prot_idx = np.concatenate(
+                neighbor_lists
+            ) if len(lig_idx) else np.empty(0, dtype=np.intp)
+            if cp is not None and len(lig_idx) > GPU_PAIR_THRESHOLD:
+                # GPU offload: gather + fused subtract/square/sum on the
+                # device, single transfer back of the squared distances
+                lig_d = cp.asarray(self.lig_coords)[cp.asarray(lig_idx)]
+                prot_d = cp.asarray(self.prot_coords)[cp.asarray(prot_idx)]
+                diff = (lig_d - prot_d).astype(cp.float64)
+                dist2 = cp.asnumpy(cp.einsum('ij,ij->i', diff, diff))
+            elif _candidate_sqdists_numba is not None:
+                # Parallel JIT kernel: prange splits the pairs across cores
+                dist2 = _candidate_sqdists_numba(
+                    self.lig_coords, self.prot_coords, lig_idx, prot_idx
+                )
+            else:
+                # Single fused subtract/square/sum over contiguous float32
+                # rows - keeps the whole reduction in NumPy's SIMD kernels
+                diff = self.lig_coords[lig_idx] - self.prot_coords[prot_idx]
+                dist2 = np.einsum('ij,ij->i', diff, diff, dtype=np.float64)
+
+            # The cells yield a superset of the contact sphere (corner
+            # atoms can sit out to ~10 Å); trim to the true 6 Å cutoff
+            within = dist2 <= CONTACT_DIST2
+            lig_idx = lig_idx[within]
+            prot_idx = prot_idx[within]
+            dist2 = dist2[within]
+        else:
+            lig_idx = prot_idx = np.empty(0, dtype=np.intp)
+            dist2 = np.empty(0, dtype=np.float64)
+
+        # Every candidate protein atom is an interacting residue, whether
+        # or not its pairs classify as a specific interaction type
+        for pi in np.unique(prot_idx):
+            interacting_residues.add(
+                f"{self.prot_resnames[pi]}{self.prot_res_ids[pi]}"
+            )
+
+        # Classify all candidate pairs in one kernel call (Numba-compiled
+        # when available, vectorized NumPy otherwise), working on squared
+        # distances throughout
+        if len(lig_idx):
+            codes = _classify_pairs(
+                dist2,
+                self.lig_elem[lig_idx],
+                self.prot_elem[prot_idx],
+                self.prot_res_flags[prot_idx]
+            )
+        else:
+            codes = np.empty(0, dtype=np.int8)
+
+        code_to_key = {
+            HBOND_CODE: 'hBonds',
+            HYDROPHOBIC_CODE: 'hydrophobic',
+            PI_STACKING_CODE: 'piStacking',
+            IONIC_CODE: 'ionic'
+        }
+
+        # Deduplicate each class on the parallel arrays (sqrt + round
+        # only the accepted pairs) and emit dicts for the survivors only
+        for code, key in code_to_key.items():
+            mask = codes == code
+            interactions[key] = self._deduplicate_interactions(
+                prot_idx[mask], lig_idx[mask],
+                np.round(np.sqrt(dist2[mask]), 2)
+            )
+
         # Summary statistics
         interactions['summary'] = {
             'totalInteractions': (
@@ -261,17 +539,36 @@ class InteractionAnalyzer:
         
         return interactions
     
-    def _deduplicate_interactions(self, interaction_list: List[Dict]) -> List[Dict]:
+    def _deduplicate_interactions(self, prot_i, lig_i, dists) -> List[Dict]:
         """
         Remove duplicate interactions (keep shortest distance)
+
+        Operates on parallel index/distance arrays: a stable argsort by
+        distance plus np.unique over the (residue, ligandAtom) keys picks
+        the min-distance entry per key without a Python dict pass.
         """
-        unique = {}
-        for interaction in interaction_list:
-            key = (interaction['residue'], interaction['ligandAtom'])
-            if key not in unique or interaction['distance'] < unique[key]['distance']:
-                unique[key] = interaction
-        
-        return sorted(list(unique.values()), key=lambda x: x['distance'])
+        if not len(prot_i):
+            return []
+
+        res_labels = np.char.add(
+            self.prot_resnames[prot_i],
+            self.prot_res_ids[prot_i].astype('U11')
+        )
+        lig_names = self.lig_atom_names[lig_i]
+        keys = np.char.add(np.char.add(res_labels, '|'), lig_names)
+
+        order = np.argsort(dists, kind='stable')
+        _, first = np.unique(keys[order], return_index=True)
+        keep = order[first]
+        # Final list ordered by distance, ties broken by candidate order
+        keep = keep[np.lexsort((keep, dists[keep]))]
+
+        return [{
+            'residue': str(res_labels[k]),
+            'proteinAtom': str(self.prot_atom_names[prot_i[k]]),
+            'ligandAtom': str(lig_names[k]),
+            'distance': dists[k].item()
+        } for k in keep]
 
 
 def analyze_complex(complex_pdb_path: str) -> Dict:
@@ -298,6 +595,49 @@ def analyze_complex(complex_pdb_path: str) -> Dict:
         }
 
 
+def analyze_poses(receptor_pdb_path: str, pose_paths: List[str]) -> List[Dict]:
+    """
+    Analyze multiple docked poses against one receptor
+
+    The receptor is parsed and binned into the cell list once; each pose
+    only pays the (small) ligand parse and the candidate-pair pass.
+
+    Args:
+        receptor_pdb_path: Path to receptor-only PDB file
+        pose_paths: Paths to ligand-only pose PDB files
+
+    Returns:
+        List of interaction dictionaries, one per pose (same order)
+    """
+    try:
+        analyzer = InteractionAnalyzer(receptor_pdb_path=receptor_pdb_path)
+    except Exception as e:
+        print(f"[Interaction Analysis Error] {str(e)}", file=sys.stderr)
+        return [{
+            'hBonds': [],
+            'hydrophobic': [],
+            'piStacking': [],
+            'ionic': [],
+            'summary': {'error': str(e)}
+        } for _ in pose_paths]
+
+    results = []
+    for pose_path in pose_paths:
+        try:
+            analyzer.set_ligand(pose_path)
+            results.append(analyzer.analyze())
+        except Exception as e:
+            print(f"[Interaction Analysis Error] {pose_path}: {str(e)}", file=sys.stderr)
+            results.append({
+                'hBonds': [],
+                'hydrophobic': [],
+                'piStacking': [],
+                'ionic': [],
+                'summary': {'error': str(e)}
+            })
+    return results
+
+
 if __name__ == '__main__':
     # For standalone testing
     import sys
@@ -8,119 +8,150 @@ import sys
 import os
 import json
 import time
+import shutil
+import threading
 import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 
-# Test cases with expected values
-TEST_CASES = [
-    {
-        "id": "TC1",
-        "name": "HIV Protease + Ritonavir",
-        "protein_pdb": "1HSG",
-        "ligand_name": "Ritonavir",
-        "smiles": "CC(C)c1nc(cn1C[C@@H](C(=O)NC(Cc2ccccc2)C[C@@H](C(=O)NC(c3ccc(cc3)N4CCCCC4)C(C)(C)C)O)NC(=O)OCc5cncs5)C(C)C",
-        "exhaustivity": 2,
-        "num_poses": 1,
-        "expected_affinity_min": -11.0,
-        "expected_affinity_max": -9.0,
-        "expected_time_max": 60,
-        "auto_grid": True
-    },
-    {
-        "id": "TC2",
-        "name": "HIV Protease + Indinavir",
-        "protein_pdb": "1HSG",
-        "ligand_name": "Indinavir",
-        "smiles": "CC(C)(C)NC(=O)[C@@H]1CN(CCN1Cc2cccnc2)C[C@H](C[C@H](Cc3ccccc3)C(=O)N[C@H]4c5ccccc5C[C@H]4O)O",
-        "exhaustivity": 2,
-        "num_poses": 1,
-        "expected_affinity_min": -12.0,
-        "expected_affinity_max": -10.0,
-        "expected_time_max": 40,
-        "auto_grid": True
-    },
-    {
-        "id": "TC3",
-        "name": "Estrogen Receptor + Tamoxifen",
-        "protein_pdb": "3ERT",
-        "ligand_name": "Tamoxifen",
-        "smiles": "CCC(=C(c1ccccc1)c2ccc(cc2)OCCN(C)C)c3ccccc3",
-        "exhaustivity": 2,
-        "num_poses": 1,
-        "expected_affinity_min": -10.0,
-        "expected_affinity_max": -8.0,
-        "expected_time_max": 20,
-        "auto_grid": True
-    },
-    {
-        "id": "TC4",
-        "name": "Thrombin + Dabigatran",
-        "protein_pdb": "2ZFF",
-        "ligand_name": "Dabigatran",
-        "smiles": "CCC(=O)N(c1ccc(cc1N)C(=O)N2CCN(CC2)c3nc4ccccc4n3C)c5ccc(cc5)C(=O)O",
-        "exhaustivity": 2,
-        "num_poses": 1,
-        "expected_affinity_min": -9.0,
-        "expected_affinity_max": -7.0,
-        "expected_time_max": 50,
-        "auto_grid": True
-    },
-    {
-        "id": "TC5",
-        "name": "Acetylcholinesterase + Donepezil",
-        "protein_pdb": "1EVE",
-        "ligand_name": "Donepezil",
-        "smiles": "COc1cc2c(cc1OC)CC(C2)CC(=O)Nc3c4ccccc4ccc3",
-        "exhaustivity": 2,
-        "num_poses": 1,
-        "expected_affinity_min": -11.0,
-        "expected_affinity_max": -9.0,
-        "expected_time_max": 25,
-        "auto_grid": True
-    },
-    {
-        "id": "TC6",
-        "name": "COVID-19 Mpro + Nirmatrelvir",
-        "protein_pdb": "7VH8",
-        "ligand_name": "Nirmatrelvir",
-        "smiles": "CC(C)(C)NC(=O)[C@H](C(C)(C)C)NC(=O)[C@H](F)c1cc2c(cc1F)C[C@@H]2C(=O)NC(C#N)C[C@H]3CCNC3=O",
-        "exhaustivity": 2,
-        "num_poses": 1,
-        "expected_affinity_min": -6.0,  # Covalent inhibitor - Vina only calculates non-covalent component
-        "expected_affinity_max": -5.0,
-        "expected_time_max": 90,
-        "auto_grid": True,
-        "note": "Covalent inhibitor - Vina only models non-covalent binding"
-    },
-    {
-        "id": "TC7",
-        "name": "ABL1 Kinase + Imatinib",
-        "protein_pdb": "2HYY",
-        "ligand_name": "Imatinib",
-        "smiles": "CN1CCN(CC1)Cc2ccc(cc2)C(=O)Nc3ccc(c(c3)Nc4nccc(n4)c5cccnc5)C",
-        "exhaustivity": 2,
-        "num_poses": 1,
-        "expected_affinity_min": -10.0,
-        "expected_affinity_max": -8.0,
-        "expected_time_max": 45,
-        "auto_grid": True
-    },
-    {
-        "id": "TC8",
-        "name": "COX-2 + Aspirin",
-        "protein_pdb": "5KIR",
-        "ligand_name": "Aspirin",
-        "smiles": "CC(=O)Oc1ccccc1C(=O)O",
-        "exhaustivity": 2,
-        "num_poses": 1,
-        "expected_affinity_min": -7.0,
-        "expected_affinity_max": -5.0,
-        "expected_time_max": 15,
-        "auto_grid": True,
-        "note": "Weak binder as expected"
-    }
-]
+
+@dataclass(frozen=True, slots=True)
+class TestCase:
+    """One docking test case with its expected result envelope"""
+    id: str
+    name: str
+    protein_pdb: str
+    ligand_name: str
+    smiles: str
+    exhaustivity: int
+    num_poses: int
+    expected_affinity_min: float
+    expected_affinity_max: float
+    expected_time_max: int
+    auto_grid: bool = True
+    note: str | None = None
+
+# Threads Vina may use per test case; the pool is sized so that
+# pool_workers x VINA_CPUS stays at or below the machine's core count
+VINA_CPUS = 2
+
+# Resolved once: every subprocess spawns with this cwd, and path checks
+# stay correct regardless of the caller's working directory
+_SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Prepared receptors cached across cases and suite runs, keyed by PDB
+# ID (shared location with test_full_docking_mgltools.py)
+RECEPTOR_CACHE_DIR = os.path.join(_SCRIPT_DIR, '.cache', 'receptors')
+
+# Raw receptor PDBs downloaded from RCSB, cached across suite runs
+PDB_CACHE_DIR = os.path.join(_SCRIPT_DIR, '.cache', 'pdb')
+
+# Test cases with expected values. Frozen, slotted instances: attribute
+# access is a C-level slot load instead of a dict probe, and the tuple
+# is safe to share with parallel workers
+TEST_CASES = (
+    TestCase(
+        id="TC1",
+        name="HIV Protease + Ritonavir",
+        protein_pdb="1HSG",
+        ligand_name="Ritonavir",
+        smiles="CC(C)c1nc(cn1C[C@@H](C(=O)NC(Cc2ccccc2)C[C@@H](C(=O)NC(c3ccc(cc3)N4CCCCC4)C(C)(C)C)O)NC(=O)OCc5cncs5)C(C)C",
+        exhaustivity=2,
+        num_poses=1,
+        expected_affinity_min=-11.0,
+        expected_affinity_max=-9.0,
+        expected_time_max=60
+    ),
+    TestCase(
+        id="TC2",
+        name="HIV Protease + Indinavir",
+        protein_pdb="1HSG",
+        ligand_name="Indinavir",
+        smiles="CC(C)(C)NC(=O)[C@@H]1CN(CCN1Cc2cccnc2)C[C@H](C[C@H](Cc3ccccc3)C(=O)N[C@H]4c5ccccc5C[C@H]4O)O",
+        exhaustivity=2,
+        num_poses=1,
+        expected_affinity_min=-12.0,
+        expected_affinity_max=-10.0,
+        expected_time_max=40
+    ),
+    TestCase(
+        id="TC3",
+        name="Estrogen Receptor + Tamoxifen",
+        protein_pdb="3ERT",
+        ligand_name="Tamoxifen",
+        smiles="CCC(=C(c1ccccc1)c2ccc(cc2)OCCN(C)C)c3ccccc3",
+        exhaustivity=2,
+        num_poses=1,
+        expected_affinity_min=-10.0,
+        expected_affinity_max=-8.0,
+        expected_time_max=20
+    ),
+    TestCase(
+        id="TC4",
+        name="Thrombin + Dabigatran",
+        protein_pdb="2ZFF",
+        ligand_name="Dabigatran",
+        smiles="CCC(=O)N(c1ccc(cc1N)C(=O)N2CCN(CC2)c3nc4ccccc4n3C)c5ccc(cc5)C(=O)O",
+        exhaustivity=2,
+        num_poses=1,
+        expected_affinity_min=-9.0,
+        expected_affinity_max=-7.0,
+        expected_time_max=50
+    ),
+    TestCase(
+        id="TC5",
+        name="Acetylcholinesterase + Donepezil",
+        protein_pdb="1EVE",
+        ligand_name="Donepezil",
+        smiles="COc1cc2c(cc1OC)CC(C2)CC(=O)Nc3c4ccccc4ccc3",
+        exhaustivity=2,
+        num_poses=1,
+        expected_affinity_min=-11.0,
+        expected_affinity_max=-9.0,
+        expected_time_max=25
+    ),
+    TestCase(
+        id="TC6",
+        name="COVID-19 Mpro + Nirmatrelvir",
+        protein_pdb="7VH8",
+        ligand_name="Nirmatrelvir",
+        smiles="CC(C)(C)NC(=O)[C@H](C(C)(C)C)NC(=O)[C@H](F)c1cc2c(cc1F)C[C@@H]2C(=O)NC(C#N)C[C@H]3CCNC3=O",
+        exhaustivity=2,
+        num_poses=1,
+        expected_affinity_min=-6.0,  # Covalent inhibitor - Vina only calculates non-covalent component
+        expected_affinity_max=-5.0,
+        expected_time_max=90,
+        note="Covalent inhibitor - Vina only models non-covalent binding"
+    ),
+    TestCase(
+        id="TC7",
+        name="ABL1 Kinase + Imatinib",
+        protein_pdb="2HYY",
+        ligand_name="Imatinib",
+        smiles="CN1CCN(CC1)Cc2ccc(cc2)C(=O)Nc3ccc(c(c3)Nc4nccc(n4)c5cccnc5)C",
+        exhaustivity=2,
+        num_poses=1,
+        expected_affinity_min=-10.0,
+        expected_affinity_max=-8.0,
+        expected_time_max=45
+    ),
+    TestCase(
+        id="TC8",
+        name="COX-2 + Aspirin",
+        protein_pdb="5KIR",
+        ligand_name="Aspirin",
+        smiles="CC(=O)Oc1ccccc1C(=O)O",
+        exhaustivity=2,
+        num_poses=1,
+        expected_affinity_min=-7.0,
+        expected_affinity_max=-5.0,
+        expected_time_max=15,
+        note="Weak binder as expected"
+    )
+)
 
 class Colors:
     """ANSI color codes for terminal output"""
@@ -136,55 +167,66 @@ class Colors:
 
 class TestLogger:
     """Logger for test results"""
-    
+
+    # Level -> ANSI prefix, looked up once per message instead of a
+    # four-way if/elif chain
+    _LEVEL_PREFIX = {
+        "ERROR": Colors.FAIL,
+        "SUCCESS": Colors.OKGREEN,
+        "WARNING": Colors.WARNING,
+        "INFO": Colors.OKCYAN
+    }
+
     def __init__(self, log_file="test_results.log"):
         self.log_file = log_file
         self.start_time = datetime.now()
         self.results = []
-        
-        # Initialize log file
-        with open(self.log_file, 'w') as f:
-            f.write(f"ProteinDock Test Suite - Started at {self.start_time}\n")
-            f.write("=" * 80 + "\n\n")
+        # Serializes log-file writes from parallel test workers
+        self._lock = threading.Lock()
+
+        # One persistent line-buffered handle for the whole run instead
+        # of an open/close pair per log line
+        self._fh = open(self.log_file, 'w', buffering=1)
+        self._fh.write(f"ProteinDock Test Suite - Started at {self.start_time}\n")
+        self._fh.write("=" * 80 + "\n\n")
+
+    def close(self):
+        """Close the log file handle"""
+        if not self._fh.closed:
+            self._fh.close()
     
     def log(self, message, level="INFO"):
         """Log message to both console and file"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
+        # time.strftime skips building a datetime object per message
+        timestamp = time.strftime("%H:%M:%S")
         log_message = f"[{timestamp}] [{level}] {message}"
-        
+
         # Console output with colors
-        if level == "ERROR":
-            print(f"{Colors.FAIL}{log_message}{Colors.ENDC}")
-        elif level == "SUCCESS":
-            print(f"{Colors.OKGREEN}{log_message}{Colors.ENDC}")
-        elif level == "WARNING":
-            print(f"{Colors.WARNING}{log_message}{Colors.ENDC}")
-        elif level == "INFO":
-            print(f"{Colors.OKCYAN}{log_message}{Colors.ENDC}")
-        else:
-            print(log_message)
+        prefix = self._LEVEL_PREFIX.get(level, "")
+        print(f"{prefix}{log_message}{Colors.ENDC}" if prefix else log_message)
         
         # File output
-        with open(self.log_file, 'a') as f:
-            f.write(log_message + "\n")
-    
+        with self._lock:
+            self._fh.write(log_message + "\n")
+
     def log_test_result(self, test_case, result):
         """Log test case result"""
-        self.results.append({
-            "test_case": test_case,
-            "result": result,
-            "timestamp": datetime.now()
-        })
-        
-        with open(self.log_file, 'a') as f:
+        with self._lock:
+            self.results.append({
+                "test_case": test_case,
+                "result": result,
+                "timestamp": datetime.now()
+            })
+
+            f = self._fh
             f.write("\n" + "-" * 80 + "\n")
-            f.write(f"Test Case: {test_case['id']} - {test_case['name']}\n")
+            f.write(f"Test Case: {test_case.id} - {test_case.name}\n")
             f.write(f"Status: {result['status']}\n")
             f.write(f"Duration: {result.get('duration', 'N/A')} seconds\n")
-            
+
             if result['status'] == 'PASSED':
                 f.write(f"Actual Affinity: {result['affinity']:.2f} kcal/mol\n")
-                f.write(f"Expected Range: {test_case['expected_affinity_min']:.1f} to {test_case['expected_affinity_max']:.1f} kcal/mol\n")
+                f.write(f"Expected Range: {test_case.expected_affinity_min:.1f} to {test_case.expected_affinity_max:.1f} kcal/mol\n")
                 f.write(f"Validation: {'✓ PASS' if result['affinity_in_range'] else '✗ FAIL - Out of range'}\n")
             elif result['status'] == 'FAILED':
                 f.write(f"Error: {result.get('error', 'Unknown error')}\n")
@@ -196,9 +238,17 @@ class TestLogger:
         end_time = datetime.now()
         duration = (end_time - self.start_time).total_seconds()
         
-        passed = sum(1 for r in self.results if r['result']['status'] == 'PASSED' and r['result'].get('affinity_in_range', False))
-        failed = sum(1 for r in self.results if r['result']['status'] == 'FAILED')
-        out_of_range = sum(1 for r in self.results if r['result']['status'] == 'PASSED' and not r['result'].get('affinity_in_range', False))
+        # Single pass over the results instead of three sum() scans
+        passed = failed = out_of_range = 0
+        for r in self.results:
+            res = r['result']
+            if res['status'] == 'FAILED':
+                failed += 1
+            elif res['status'] == 'PASSED':
+                if res.get('affinity_in_range', False):
+                    passed += 1
+                else:
+                    out_of_range += 1
         total = len(self.results)
         
         summary = f"""
@@ -218,8 +268,8 @@ Average Time per Test: {(duration/total) if total > 0 else 0:.1f} seconds
         
         print(f"{Colors.BOLD}{summary}{Colors.ENDC}")
         
-        with open(self.log_file, 'a') as f:
-            f.write(summary)
+        with self._lock:
+            self._fh.write(summary)
         
         # Detailed results
         print(f"\n{Colors.HEADER}{Colors.BOLD}DETAILED RESULTS:{Colors.ENDC}")
@@ -231,114 +281,251 @@ Average Time per Test: {(duration/total) if total > 0 else 0:.1f} seconds
                 status_icon = "✓" if res.get('affinity_in_range', False) else "⚠"
                 status_color = Colors.OKGREEN if res.get('affinity_in_range', False) else Colors.WARNING
                 affinity_str = f"{res['affinity']:.2f} kcal/mol"
-                expected_str = f"[{tc['expected_affinity_min']:.1f} to {tc['expected_affinity_max']:.1f}]"
-                print(f"{status_color}{status_icon} {tc['id']}: {tc['name']}{Colors.ENDC}")
+                expected_str = f"[{tc.expected_affinity_min:.1f} to {tc.expected_affinity_max:.1f}]"
+                print(f"{status_color}{status_icon} {tc.id}: {tc.name}{Colors.ENDC}")
                 print(f"   Affinity: {affinity_str} {expected_str} | Time: {res['duration']:.1f}s")
             else:
-                print(f"{Colors.FAIL}✗ {tc['id']}: {tc['name']}{Colors.ENDC}")
+                print(f"{Colors.FAIL}✗ {tc.id}: {tc.name}{Colors.ENDC}")
                 print(f"   Error: {res.get('error', 'Unknown')}")
-            
-            if 'note' in tc:
-                print(f"   Note: {tc['note']}")
+
+            if tc.note is not None:
+                print(f"   Note: {tc.note}")
             print()
 
+def _fetch_pdb(pdb_id, logger):
+    """
+    Return receptor PDB text for a PDB ID, downloading from RCSB once
+
+    Args:
+        pdb_id: Four-character PDB ID, e.g. '1HSG'
+        logger: Suite logger for the download message
+
+    Returns:
+        Full PDB file content as text
+    """
+    cached = os.path.join(PDB_CACHE_DIR, f'{pdb_id}.pdb')
+    if os.path.exists(cached):
+        with open(cached) as f:
+            return f.read()
+
+    import requests
+    response = requests.get(f'https://files.rcsb.org/download/{pdb_id}.pdb',
+                            timeout=30)
+    response.raise_for_status()
+    os.makedirs(PDB_CACHE_DIR, exist_ok=True)
+    with open(cached, 'w') as f:
+        f.write(response.text)
+    logger.log(f"Downloaded and cached {pdb_id}.pdb")
+    return response.text
+
 def run_docking_test(test_case, logger):
     """Run a single docking test case"""
-    logger.log(f"Starting test: {test_case['id']} - {test_case['name']}")
-    
+    logger.log(f"Starting test: {test_case.id} - {test_case.name}")
+
     start_time = time.time()
     result = {
         'status': 'FAILED',
         'duration': 0,
         'error': None
     }
-    
+
     try:
-        # Prepare command
-        cmd = [
-            sys.executable,
-            'vina_docking.py',
-            '--smiles', test_case['smiles'],
-            '--receptor_pdb', test_case['protein_pdb'],
-            '--exhaustiveness', str(test_case['exhaustivity']),
-            '--num_poses', str(test_case['num_poses'])
-        ]
-        
-        logger.log(f"Running: {' '.join(cmd)}", "INFO")
-        
-        # Run docking
+        # vina_docking.py takes no CLI arguments: it reads one JSON
+        # request on stdin (see vina_docking.main), so the case is
+        # expressed through that interface. Each receptor group gets
+        # its own work_dir so parallel groups do not clobber each
+        # other's intermediates
+        work_dir = os.path.join(_SCRIPT_DIR, 'docking_temp', test_case.protein_pdb)
+        request = {
+            'smiles': test_case.smiles,
+            'pdb_content': _fetch_pdb(test_case.protein_pdb, logger),
+            'auto_grid': test_case.auto_grid,
+            'work_dir': work_dir,
+            'config': {
+                'exhaustivity': test_case.exhaustivity,
+                'numPoses': test_case.num_poses,
+                # Bound Vina's thread spawn: run_vina_docking honors
+                # config['cpu'], and with the pool sized to
+                # cpu_count // VINA_CPUS workers, pool_workers x
+                # vina_cpus stays at or below the physical core count,
+                # so concurrent cases do not oversubscribe and thrash
+                # context switches
+                'cpu': VINA_CPUS,
+            },
+        }
+        cmd = [sys.executable, 'vina_docking.py']
+
+        # Reuse a previously prepared receptor: two cases share 1HSG, and
+        # across suite runs every prep after the first is redundant. The
+        # docking script skips its receptor prep when this key is set
+        receptor_cache = os.path.join(RECEPTOR_CACHE_DIR, f'{test_case.protein_pdb}.pdbqt')
+        if os.path.exists(receptor_cache):
+            logger.log(f"Using cached receptor: {receptor_cache}")
+            request['receptor_pdbqt'] = receptor_cache
+
+        logger.log(f"Running: {' '.join(cmd)} (request on stdin)", "INFO")
+
+        # Run docking, streaming output line by line instead of buffering
+        # the whole stdout with communicate(). Only a bounded tail is kept
+        # for error reporting, and affinity is parsed inline as lines arrive.
+        # stderr stays on its own pipe so the JSON protocol lines on stdout
+        # never interleave with log output
         process = subprocess.Popen(
             cmd,
+            stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
-            cwd=os.path.dirname(os.path.abspath(__file__))
+            bufsize=1,
+            cwd=_SCRIPT_DIR
         )
-        
-        stdout, stderr = process.communicate(timeout=300)  # 5 minute timeout
-        
+
+        # Drain stderr on a background thread (same pattern as
+        # run_vina_docking) so neither pipe can fill up and deadlock
+        stderr_chunks = []
+        drainer = threading.Thread(
+            target=lambda: stderr_chunks.append(process.stderr.read()),
+            daemon=True
+        )
+        drainer.start()
+
+        # Out-of-band 5 minute cap: the timer kills a hung child so the
+        # reader loop below can never block forever
+        timer = threading.Timer(300, process.kill)
+        timer.start()
+
+        affinity = None
+        tail = deque(maxlen=200)
+        try:
+            # The child reads stdin to EOF before doing any work, so
+            # writing the whole request up front cannot deadlock
+            process.stdin.write(json.dumps(request))
+            process.stdin.close()
+            # Every protocol line the child emits is one JSON object
+            # (progress or final result, see vina_docking._emit); the
+            # final result carries best_affinity. Anything else on the
+            # stream is kept only for the error tail
+            for line in process.stdout:
+                tail.append(line)
+                if not line.startswith('{'):
+                    continue
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if message.get('best_affinity') is not None:
+                    affinity = float(message['best_affinity'])
+            returncode = process.wait()
+            drainer.join()
+        finally:
+            timed_out = not timer.is_alive()
+            timer.cancel()
+
         duration = time.time() - start_time
         result['duration'] = duration
-        
-        if process.returncode != 0:
-            result['error'] = f"Process failed with code {process.returncode}: {stderr}"
+
+        if timed_out:
+            result['error'] = "Test timed out after 5 minutes"
+            logger.log(result['error'], "ERROR")
+            return result
+
+        tail_text = ''.join(tail)
+        stderr_tail = ''.join(stderr_chunks)[-2000:]
+        if returncode != 0:
+            result['error'] = f"Process failed with code {returncode}: {stderr_tail or tail_text}"
             logger.log(f"Test failed: {result['error']}", "ERROR")
             return result
-        
-        # Parse output for affinity
-        affinity = None
-        for line in stdout.split('\n'):
-            if 'Best affinity' in line or 'Affinity:' in line:
-                # Extract number like "-9.5 kcal/mol"
-                parts = line.split()
-                for i, part in enumerate(parts):
-                    try:
-                        affinity = float(part)
-                        break
-                    except ValueError:
-                        continue
-                if affinity is not None:
-                    break
-        
-        if affinity is None:
-            # Try JSON output format
-            try:
-                output_data = json.loads(stdout)
-                if 'poses' in output_data and len(output_data['poses']) > 0:
-                    affinity = output_data['poses'][0]['affinity']
-            except:
-                pass
-        
+
         if affinity is None:
             result['error'] = "Could not parse affinity from output"
-            logger.log(f"Failed to parse affinity. Output: {stdout[:500]}", "ERROR")
+            logger.log(f"Failed to parse affinity. Output: {tail_text[:500]} "
+                       f"Stderr: {stderr_tail}", "ERROR")
             return result
         
         # Validate affinity range
-        affinity_in_range = (test_case['expected_affinity_min'] <= affinity <= test_case['expected_affinity_max'])
-        
+        affinity_in_range = (test_case.expected_affinity_min <= affinity <= test_case.expected_affinity_max)
+
         result['status'] = 'PASSED'
         result['affinity'] = affinity
         result['affinity_in_range'] = affinity_in_range
-        
+
+        # Populate the cache from the prepared receptor this run produced
+        if not os.path.exists(receptor_cache):
+            prepared = os.path.join(work_dir, 'receptor.pdbqt')
+            if os.path.exists(prepared):
+                try:
+                    os.makedirs(RECEPTOR_CACHE_DIR, exist_ok=True)
+                    shutil.copy(prepared, receptor_cache)
+                    logger.log(f"Cached prepared receptor: {receptor_cache}")
+                except OSError as e:
+                    logger.log(f"Could not cache receptor: {e}", "WARNING")
+
         # Log time validation
-        if duration > test_case['expected_time_max']:
-            logger.log(f"Warning: Test took {duration:.1f}s (expected max {test_case['expected_time_max']}s)", "WARNING")
-        
+        if duration > test_case.expected_time_max:
+            logger.log(f"Warning: Test took {duration:.1f}s (expected max {test_case.expected_time_max}s)", "WARNING")
+
         if affinity_in_range:
-            logger.log(f"Test PASSED: Affinity {affinity:.2f} kcal/mol in expected range [{test_case['expected_affinity_min']}, {test_case['expected_affinity_max']}]", "SUCCESS")
+            logger.log(f"Test PASSED: Affinity {affinity:.2f} kcal/mol in expected range [{test_case.expected_affinity_min}, {test_case.expected_affinity_max}]", "SUCCESS")
         else:
-            logger.log(f"Test PASSED but affinity OUT OF RANGE: {affinity:.2f} kcal/mol (expected [{test_case['expected_affinity_min']}, {test_case['expected_affinity_max']}])", "WARNING")
+            logger.log(f"Test PASSED but affinity OUT OF RANGE: {affinity:.2f} kcal/mol (expected [{test_case.expected_affinity_min}, {test_case.expected_affinity_max}])", "WARNING")
         
-    except subprocess.TimeoutExpired:
-        result['error'] = "Test timed out after 5 minutes"
-        logger.log(result['error'], "ERROR")
     except Exception as e:
         result['error'] = str(e)
         logger.log(f"Test error: {e}", "ERROR")
     
     return result
 
+def run_protein_group(cases, logger):
+    """
+    Run all test cases sharing one receptor, in order
+
+    The first case prepares the receptor and populates the cache; the
+    rest reuse it, so each protein pays for preparation exactly once.
+    """
+    return [(test_case, run_docking_test(test_case, logger)) for test_case in cases]
+
+def preflight(logger):
+    """
+    Fast fail-early checks before launching any docking subprocess
+
+    A misconfigured environment otherwise costs up to 300 s per test in
+    timeouts; this probes the same dependencies in a few seconds.
+    """
+    import importlib.util
+
+    ok = True
+
+    # Chemistry modules the docking pipeline imports
+    for module in ('rdkit', 'meeko'):
+        if importlib.util.find_spec(module) is None:
+            logger.log(f"Preflight: required module '{module}' is not importable", "ERROR")
+            ok = False
+
+    # Vina: Python bindings or the bundled binary both work
+    vina_bin = Path(__file__).parent / 'vina_bin'
+    if importlib.util.find_spec('vina') is None and not (
+            (vina_bin / 'vina').exists() or (vina_bin / 'vina.exe').exists()):
+        logger.log("Preflight: neither the vina package nor a vina_bin binary found", "ERROR")
+        ok = False
+
+    # MGLTools is optional (receptor prep falls back to BioPython)
+    if not (Path(__file__).parent / 'mgltools').exists():
+        logger.log("Preflight: bundled mgltools/ not found, receptor prep will use fallback", "WARNING")
+
+    # One cheap probe of the PDB download path every test case depends on
+    try:
+        import requests
+        response = requests.head('https://files.rcsb.org/download/1HSG.pdb',
+                                 timeout=3, allow_redirects=True)
+        if response.status_code >= 400:
+            logger.log(f"Preflight: RCSB returned HTTP {response.status_code}", "ERROR")
+            ok = False
+    except Exception as e:
+        logger.log(f"Preflight: cannot reach RCSB ({e})", "ERROR")
+        ok = False
+
+    return ok
+
 def main():
     """Main test runner"""
     print(f"{Colors.HEADER}{Colors.BOLD}")
@@ -349,29 +536,48 @@ def main():
     
     logger = TestLogger("test_results.log")
     
-    # Check if we're in the right directory
-    if not os.path.exists('vina_docking.py'):
-        logger.log("Error: vina_docking.py not found. Please run from backend directory.", "ERROR")
+    # Resolve against the script dir so running from any cwd works
+    if not os.path.exists(os.path.join(_SCRIPT_DIR, 'vina_docking.py')):
+        logger.log("Error: vina_docking.py not found next to this script.", "ERROR")
         sys.exit(1)
     
+    # Fail the whole suite in seconds if the environment is broken,
+    # instead of letting every case run into its 5 minute timeout
+    if not preflight(logger):
+        logger.log("Preflight failed - aborting test suite", "ERROR")
+        sys.exit(2)
+
     logger.log(f"Found {len(TEST_CASES)} test cases to run")
-    
-    # Run tests
-    for i, test_case in enumerate(TEST_CASES, 1):
-        print(f"\n{Colors.BOLD}[{i}/{len(TEST_CASES)}] Running: {test_case['name']}{Colors.ENDC}")
-        
-        result = run_docking_test(test_case, logger)
-        logger.log_test_result(test_case, result)
-        
-        # Brief pause between tests
-        if i < len(TEST_CASES):
-            time.sleep(2)
-    
+
+    # Group cases by receptor: cases sharing a protein (TC1/TC2 both use
+    # 1HSG) run serially in one worker so the first prepares and caches
+    # the receptor and the rest reuse it; distinct proteins still run in
+    # parallel. Sized so pool_workers x VINA_CPUS <= core count
+    groups = {}
+    for test_case in TEST_CASES:
+        groups.setdefault(test_case.protein_pdb, []).append(test_case)
+
+    max_workers = min(len(groups), max(1, (os.cpu_count() or 2) // VINA_CPUS))
+    logger.log(f"Running {len(groups)} receptor groups, up to {max_workers} in parallel")
+
+    completed = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(run_protein_group, cases, logger)
+            for cases in groups.values()
+        ]
+        for future in as_completed(futures):
+            for test_case, result in future.result():
+                completed += 1
+                print(f"\n{Colors.BOLD}[{completed}/{len(TEST_CASES)}] Completed: {test_case.name}{Colors.ENDC}")
+                logger.log_test_result(test_case, result)
+
     # Generate summary
     logger.generate_summary()
     
     logger.log("Test suite complete!", "SUCCESS")
     logger.log(f"Full results saved to: {os.path.abspath(logger.log_file)}")
+    logger.close()
 
 if __name__ == "__main__":
     main()
@@ -6,28 +6,69 @@ Tests the complete Ritonavir + 1HSG docking pipeline with:
 - Proper ligand preparation (RDKit + Meeko)
 - GOLD STANDARD receptor preparation (MGLTools prepare_receptor4.py)
 - Correct grid center (13.1, 22.5, 5.6) from MK1 binding site
+
+Calls the docking functions directly (no argparse re-entry, no re-import
+of RDKit/Meeko/Vina per run) and caches the prepared receptor PDBQT on
+disk keyed by the PDB content hash, so repeated runs skip preparation.
 """
 
 import sys
 import os
+import json
+import hashlib
+import urllib.request
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(__file__))
 
-from vina_docking import main
+from vina_docking import setup_vina_environment, smiles_to_pdbqt, pdb_to_pdbqt, run_vina_docking
+
+# Ritonavir (corrected SMILES, 106 chars)
+RITONAVIR_SMILES = "CC(C)c1nc(cn1C[C@@H](C(=O)NC(Cc2ccccc2)C[C@@H](C(=O)NC(c3ccc(cc3)N4CCCCC4)C(C)(C)C)O)NC(=O)OCc5cncs5)C(C)C"
+
+PDB_URL = "https://files.rcsb.org/download/1HSG.pdb"
+
+# Bump to invalidate previously cached receptor preparations
+PREP_VERSION = 1
+CACHE_DIR = os.path.join(os.path.dirname(__file__), '.cache', 'receptors')
+
+
+def fetch_receptor_pdb():
+    """Download (or reuse) the 1HSG PDB in the cache directory"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    pdb_path = os.path.join(CACHE_DIR, '1HSG.pdb')
+
+    if not os.path.exists(pdb_path):
+        print(f"Downloading receptor PDB: {PDB_URL}")
+        with urllib.request.urlopen(PDB_URL) as response:
+            data = response.read()
+        with open(pdb_path, 'wb') as f:
+            f.write(data)
+
+    with open(pdb_path) as f:
+        return f.read()
+
+
+def prepare_receptor_cached(pdb_content):
+    """
+    Prepare the receptor PDBQT, reusing an on-disk cached preparation
+
+    The cache key is (sha1 of the PDB content, PREP_VERSION), so the
+    MGLTools/fallback preparation only runs once per unique receptor.
+    """
+    digest = hashlib.sha1(pdb_content.encode()).hexdigest()
+    cache_path = os.path.join(CACHE_DIR, f'{digest}-v{PREP_VERSION}.pdbqt')
+
+    if os.path.exists(cache_path):
+        print(f"Using cached receptor PDBQT: {cache_path}")
+        return cache_path
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    pdb_to_pdbqt(pdb_content, cache_path)
+    return cache_path
+
 
 if __name__ == "__main__":
-    # Test parameters for Ritonavir + 1HSG
-    test_args = [
-        "vina_docking.py",
-        "--protein-id", "69313695196d1cda93abd42d",  # 1HSG
-        "--ligand-id", "69314edfdcd6dab364652a38",    # Ritonavir (corrected SMILES)
-        "--center", "13.1", "22.5", "5.6",             # Correct binding site
-        "--size", "25", "20", "19",                    # Large enough for Ritonavir
-        "--exhaustiveness", "4",                       # Good search
-        "--output-dir", "./test_mgltools_docking"
-    ]
-    
     print("=" * 70)
     print("Testing Full Docking Pipeline with MGLTools prepare_receptor4.py")
     print("=" * 70)
@@ -35,9 +76,36 @@ if __name__ == "__main__":
     print(f"Receptor: 1HSG HIV-1 Protease")
     print(f"Grid Center: (13.1, 22.5, 5.6) - MK1 binding site")
     print(f"Grid Size: 25 x 20 x 19 Å")
-    print(f"Exhaustiveness: 8")
+    print(f"Exhaustiveness: 4")
     print(f"\nExpected Binding Affinity: -9 to -11 kcal/mol")
     print("=" * 70)
-    
-    sys.argv = test_args
-    main()
+
+    if not setup_vina_environment():
+        sys.exit(1)
+
+    output_dir = "./test_mgltools_docking"
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Ligand preparation (RDKit + Meeko)
+    ligand_pdbqt = os.path.join(output_dir, 'ligand.pdbqt')
+    smiles_to_pdbqt(RITONAVIR_SMILES, ligand_pdbqt)
+
+    # Receptor preparation, cached across runs
+    pdb_content = fetch_receptor_pdb()
+    receptor_pdbqt = prepare_receptor_cached(pdb_content)
+
+    # Same config shape as test_correct_grid.py
+    config = {
+        "gridCenter": {"x": 13.1, "y": 22.5, "z": 5.6},  # MK1 binding site
+        "gridSize": {"x": 25, "y": 20, "z": 19},
+        "exhaustivity": 4,
+        "numPoses": 5
+    }
+
+    result = run_vina_docking(receptor_pdbqt, ligand_pdbqt, config)
+    print(json.dumps(result, indent=2))
+
+    best_affinity = result.get('best_affinity')
+    if best_affinity is not None:
+        print(f"\n✅ BEST AFFINITY: {best_affinity} kcal/mol")
+        print(f"Expected range: -9 to -11 kcal/mol")
@@ -6,8 +6,31 @@ Tests with a sample complex PDB file
 import sys
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+
+def find_latest_complex(root):
+    """
+    Path of the most recent docking job's complex.pdb, or None
+
+    Scans the job directories newest-first and stops at the first hit,
+    instead of globbing every docking_jobs/<id>/ into a list and
+    arbitrarily picking element 0.
+    """
+    try:
+        entries = [e for e in os.scandir(root) if e.is_dir()]
+    except FileNotFoundError:
+        return None
+
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    for entry in entries:
+        path = os.path.join(entry.path, 'complex.pdb')
+        if os.path.exists(path):
+            return path
+    return None
+
+
 # Test 1: Interaction Analysis
 print("=" * 60)
 print("TEST 1: INTERACTION ANALYSIS")
@@ -19,12 +42,11 @@ try:
     # You can test with a real complex file if available
     # For now, we'll create a minimal test
     test_complex = Path(__file__).parent / 'docking_jobs'
-    
-    # Find a complex.pdb file in recent docking jobs
-    complex_files = list(test_complex.glob('*/complex.pdb'))
-    
-    if complex_files:
-        test_file = str(complex_files[0])
+
+    # Newest complex.pdb among recent docking jobs
+    test_file = find_latest_complex(test_complex)
+
+    if test_file:
         print(f"\n✓ Found test complex: {test_file}")
         
         # Run analysis
@@ -68,54 +90,44 @@ print("TEST 2: VISUALIZATION GENERATION")
 print("=" * 60)
 
 try:
-    from visualization import generate_visualization
-    
-    if complex_files:
-        test_file = str(complex_files[0])
+    from visualization import generate_interactive_viewer, load_complex
+
+    if test_file:
         output_dir = Path(__file__).parent / 'test_visualizations'
         output_dir.mkdir(exist_ok=True)
-        
-        # Test publication view
+
         print(f"\n✓ Testing visualization with: {test_file}")
         print(f"✓ Output directory: {output_dir}")
-        
-        # Generate publication view
-        print("\nGenerating publication view...")
-        pub_view = output_dir / 'test_publication.png'
-        success_pub = generate_visualization(test_file, str(pub_view), 'publication', 8, 8, 80)
-        
-        if success_pub:
-            print(f"✓ Publication view saved: {pub_view}")
-            if pub_view.exists():
-                print(f"  File size: {pub_view.stat().st_size / 1024:.2f} KB")
-        else:
-            print("✗ Failed to generate publication view")
-        
-        # Generate binding site view
-        print("\nGenerating binding site view...")
-        binding_view = output_dir / 'test_binding_site.png'
-        success_binding = generate_visualization(test_file, str(binding_view), 'binding_site', 8, 8, 80)
-        
-        if success_binding:
-            print(f"✓ Binding site view saved: {binding_view}")
-            if binding_view.exists():
-                print(f"  File size: {binding_view.stat().st_size / 1024:.2f} KB")
-        else:
-            print("✗ Failed to generate binding site view")
-        
-        # Generate surface view
-        print("\nGenerating surface view...")
-        surface_view = output_dir / 'test_surface.png'
-        success_surface = generate_visualization(test_file, str(surface_view), 'surface', 8, 8, 80)
-        
-        if success_surface:
-            print(f"✓ Surface view saved: {surface_view}")
-            if surface_view.exists():
-                print(f"  File size: {surface_view.stat().st_size / 1024:.2f} KB")
-        else:
-            print("✗ Failed to generate surface view")
-        
-        if success_pub or success_binding or success_surface:
+
+        # Read the complex once and feed the same content to every view
+        # instead of re-reading the PDB per viewer
+        pdb_content = load_complex(test_file)
+
+        # The three views are independent, so generate them concurrently;
+        # total time is the slowest view rather than the sum of all three
+        view_types = ('publication', 'binding_site', 'surface')
+        print(f"\nGenerating {', '.join(view_types)} views concurrently...")
+        with ThreadPoolExecutor(max_workers=len(view_types)) as executor:
+            futures = {
+                view_type: executor.submit(
+                    generate_interactive_viewer, test_file, str(output_dir),
+                    view_type=view_type, pdb_content=pdb_content
+                )
+                for view_type in view_types
+            }
+            results = {view_type: f.result() for view_type, f in futures.items()}
+
+        for view_type in view_types:
+            info = results[view_type]
+            if info:
+                html_path = Path(info['htmlPath'])
+                print(f"✓ {view_type} view saved: {html_path}")
+                if html_path.exists():
+                    print(f"  File size: {html_path.stat().st_size / 1024:.2f} KB")
+            else:
+                print(f"✗ Failed to generate {view_type} view")
+
+        if any(results.values()):
             print("\n✓ Visualization test PASSED")
             print(f"\n✓ Check output in: {output_dir}")
         else:
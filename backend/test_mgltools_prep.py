@@ -7,8 +7,15 @@ from MGLTools, which is the gold standard for AutoDock receptor preparation.
 
 import os
 import sys
+import tempfile
 import subprocess
 
+def _scratch_dir_kwargs():
+    """Place the scratch dir in RAM (/dev/shm) when available"""
+    if os.path.isdir('/dev/shm'):
+        return {'prefix': 'mgltools_test_', 'dir': '/dev/shm'}
+    return {'prefix': 'mgltools_test_'}
+
 def test_prepare_receptor4():
     """Test prepare_receptor4.py with a sample PDB"""
     
@@ -35,10 +42,17 @@ def test_prepare_receptor4():
         print(f"   ❌ python.exe NOT found: {mgltools_python}")
         return False
     
-    # Create a minimal PDB for testing (1HSG binding site)
-    test_pdb = "test_receptor.pdb"
-    test_pdbqt = "test_receptor.pdbqt"
-    
+    # Create a minimal PDB for testing (1HSG binding site) on a per-run
+    # scratch dir: nothing lands in the repo dir, cleanup is guaranteed
+    # even on error paths, and /dev/shm keeps the I/O off disk entirely
+    with tempfile.TemporaryDirectory(**_scratch_dir_kwargs()) as tmp_dir:
+        return _run_prepare_receptor4(prepare_receptor, mgltools_python, tmp_dir)
+
+def _run_prepare_receptor4(prepare_receptor, mgltools_python, tmp_dir):
+    """Run prepare_receptor4.py against a scratch PDB in tmp_dir"""
+    test_pdb = os.path.join(tmp_dir, "test_receptor.pdb")
+    test_pdbqt = os.path.join(tmp_dir, "test_receptor.pdbqt")
+
     print(f"\n2. Creating test PDB file...")
     # Simple PDB with just a few atoms for quick testing
     pdb_content = """ATOM      1  N   PRO A  25      13.100  22.500   5.600  1.00 20.00           N  
@@ -95,10 +109,6 @@ END
                 if len(lines) > 10:
                     print(f"   ... ({len(lines) - 10} more lines)")
             
-            # Cleanup
-            os.remove(test_pdbqt)
-            os.remove(test_pdb)
-            
             print(f"\n✅ SUCCESS: prepare_receptor4.py works correctly!")
             return True
         else:
@@ -2,33 +2,163 @@
 # This Python script handles molecular docking using AutoDock Vina
 
 import sys
+import csv
 import json
+import gc
+import hashlib
 import os
+import queue
+import re
+import platform
+import shutil
+import stat
+import subprocess
+import tempfile
+import threading
+import time
+import traceback
+import mmap
+import multiprocessing
+import warnings
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from io import StringIO
 from pathlib import Path
 
+import numpy as np
+
+# orjson serializes straight to bytes several times faster than the
+# stdlib encoder; fall back transparently when it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Repo-local post-processing modules, resolved once at import: every
+# docking job calls into both, so the references live in module globals
+# instead of re-entering the import machinery per call. They stay
+# optional so prep/dock stages still work where the analysis stack
+# (numba, py3Dmol deps) is incomplete.
+try:
+    from interaction_analysis import analyze_complex as _analyze_complex
+except ImportError:
+    _analyze_complex = None
+try:
+    from visualization import generate_interactive_viewer as _generate_interactive_viewer
+except ImportError:
+    _generate_interactive_viewer = None
+
+# Serialize numpy scalars/arrays in result payloads directly from their
+# buffers and tolerate non-string dict keys, so interaction results need
+# no manual float() casts before emission
+_ORJSON_OPTS = (orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+                if orjson is not None else 0)
+
+def _emit(payload):
+    """Write one JSON line (progress or result) to stdout and flush"""
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(payload, option=_ORJSON_OPTS))
+        sys.stdout.buffer.write(b'\n')
+        sys.stdout.flush()
+    else:
+        print(json.dumps(payload), flush=True)
+
+def _loads(data):
+    """Parse JSON from bytes or str with orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    return json.loads(data)
+
+# Vina result-table row: pose number then affinity and the two RMSD
+# columns, e.g. "   1        -7.5      0.000      0.000"
+# One MODEL...ENDMDL block (a single docked pose) in Vina output
+_POSE_BLOCK_RE = re.compile(rb'MODEL[\s\S]*?ENDMDL\n')
+
+# Per-file progress lines are one stderr syscall each and serialize
+# against the kernel when a loop touches many poses; opt back in with
+# PDOCK_VERBOSE=1
+_VERBOSE = os.environ.get('PDOCK_VERBOSE') == '1'
+
+# Lines dropped when merging receptor and pose into a complex
+_END_LINE_RE = re.compile(rb'^END.*\n?', re.M)
+_POSE_SKIP_RE = re.compile(rb'^(?:MODEL|ENDMDL|END).*\n?', re.M)
+
+# Record prefixes used when converting PDBQT back to PDB
+_COORD_PREFIX = (b'ATOM', b'HETATM')
+_PDB_KEEP_PREFIX = (b'ATOM', b'HETATM', b'MODEL', b'ENDMDL', b'TER', b'END')
+
+_POSE_LINE_RE = re.compile(r'^\s*(\d+)\s+(-?\d+\.\d+)\s+(-?\d+\.\d+)\s+(-?\d+\.\d+)')
+
+# Resolved once at import: run_vina_docking is called per ligand in
+# screening loops, so re-importing modules and re-statting the binary
+# on every call is avoidable per-ligand setup cost
+_VINA_BIN_DIR = Path(__file__).parent / 'vina_bin'
+_VINA_BIN = _VINA_BIN_DIR / ('vina.exe' if platform.system() == 'Windows' else 'vina')
+_VINA_BIN_EXISTS = _VINA_BIN.exists()
+_DEFAULT_CPU = min(2, multiprocessing.cpu_count() or 1)  # Limit to 2 cores to save memory
+
+# MGLTools locations resolved once at import; MGLTOOLS_PATH/MGLTOOLS_PY
+# override the default Windows install paths for non-standard setups
+_MGLTOOLS_WIN_UTIL = Path(os.environ.get(
+    'MGLTOOLS_PATH',
+    r"C:\Program Files (x86)\MGLTools-1.5.7\Lib\site-packages\AutoDockTools\Utilities24"))
+_MGLTOOLS_WIN_PY = Path(os.environ.get(
+    'MGLTOOLS_PY', r"C:\Program Files (x86)\MGLTools-1.5.7\python.exe"))
+
+# Memoized Python 2 interpreter probe: each candidate costs a
+# subprocess --version spawn, so the scan runs once per process
+_PYTHON2 = None
+_PYTHON2_PROBED = False
+
+def _find_python2():
+    """Command for a working Python 2 interpreter, or None (probed once)"""
+    global _PYTHON2, _PYTHON2_PROBED
+    if not _PYTHON2_PROBED:
+        for py2_cmd in ['python2.7', 'python2', '/usr/bin/python2.7', '/usr/bin/python2']:
+            try:
+                result = subprocess.run([py2_cmd, '--version'],
+                                        capture_output=True, timeout=2)
+                if result.returncode == 0:
+                    _PYTHON2 = py2_cmd
+                    break
+            except (FileNotFoundError, subprocess.TimeoutExpired):
+                continue
+        _PYTHON2_PROBED = True
+    return _PYTHON2
+
 # Debug: Print LD_LIBRARY_PATH
 print(f"[Debug] LD_LIBRARY_PATH = {os.environ.get('LD_LIBRARY_PATH', 'NOT SET')}", file=sys.stderr)
 
+# Cached setup_vina_environment answer: whether Vina is reachable is a
+# per-process fact, and re-probing costs a subprocess --version run
+# (50-200 ms) plus import-system scans on every docking request
+_VINA_AVAILABLE = None
+
 def setup_vina_environment():
     """
     Check if Vina is available (binary or Python package)
+
+    The probe runs once per process; repeat calls return the cached
+    answer without re-spawning the binary or re-scanning sys.path.
     """
-    import subprocess
-    import platform
-    
+    global _VINA_AVAILABLE
+    if _VINA_AVAILABLE is None:
+        _VINA_AVAILABLE = _probe_vina_environment()
+    return _VINA_AVAILABLE
+
+def _probe_vina_environment():
+    """One-time check for the Vina binary, package and prep dependencies"""
     # Check for vina binary (Windows: vina.exe, Linux: vina)
-    vina_bin_dir = Path(__file__).parent / 'vina_bin'
-    if platform.system() == 'Windows':
-        vina_bin_path = vina_bin_dir / 'vina.exe'
-    else:
-        vina_bin_path = vina_bin_dir / 'vina'
+    vina_bin_dir = _VINA_BIN_DIR
+    vina_bin_path = _VINA_BIN
     
     print(f"[Vina Setup] Looking for binary at: {vina_bin_path}", file=sys.stderr)
     print(f"[Vina Setup] Binary exists: {vina_bin_path.exists()}", file=sys.stderr)
     
     if vina_bin_path.exists():
         # Check if executable
-        import stat
         file_stat = os.stat(vina_bin_path)
         is_executable = bool(file_stat.st_mode & stat.S_IXUSR)
         print(f"[Vina Setup] Binary executable: {is_executable}", file=sys.stderr)
@@ -47,7 +177,6 @@ def setup_vina_environment():
                 print(f"[Vina] Binary didn't return Vina version info", file=sys.stderr)
         except Exception as e:
             print(f"[Vina] Binary found but not working: {str(e)}", file=sys.stderr)
-            import traceback
             print(f"[Vina] Traceback: {traceback.format_exc()}", file=sys.stderr)
     else:
         print(f"[Vina Setup] Binary not found at {vina_bin_path}", file=sys.stderr)
@@ -59,27 +188,22 @@ def setup_vina_environment():
         else:
             print(f"[Vina Setup] vina_bin directory doesn't exist!", file=sys.stderr)
     
-    # Check for Python vina package
-    try:
-        __import__('vina')
+    # Check for Python vina package without importing it - find_spec
+    # only walks the path finders, so the probe stays cheap even when
+    # the package is a heavy extension module
+    if importlib.util.find_spec('vina') is not None:
         print("[Vina] Using Python package", file=sys.stderr)
         return True
-    except ImportError:
-        pass
-    
+
     # Check other required packages
     required_packages = {
         'meeko': 'meeko',
         'rdkit': 'rdkit',
         'Bio': 'biopython'  # BioPython for PDB parsing
     }
-    
-    missing = []
-    for module, package in required_packages.items():
-        try:
-            __import__(module)
-        except ImportError:
-            missing.append(package)
+
+    missing = [package for module, package in required_packages.items()
+               if importlib.util.find_spec(module) is None]
     
     print(json.dumps({
         'status': 'error',
@@ -89,266 +213,629 @@ def setup_vina_environment():
     }), file=sys.stderr)
     return False
 
+# Prepared ligand PDBQT strings keyed by canonical SMILES: screening
+# decks repeat ligands across runs and duplicate entries within one,
+# and a hit skips embedding, minimization and Meeko entirely. Each
+# entry is a few KB of text, so the cap can be generous.
+_LIGAND_PDBQT_CACHE = {}
+_LIGAND_PDBQT_CACHE_MAX = 1024
+
 def smiles_to_pdbqt(smiles, output_file):
     """
     Convert SMILES string to PDBQT format (MEMORY OPTIMIZED)
+
+    Prepared ligands are cached in-process by canonical SMILES, so a
+    repeated ligand costs one MolFromSmiles plus a file write.
     """
     try:
         from rdkit import Chem
-        from rdkit.Chem import AllChem
-        from meeko import MoleculePreparation
-        import gc
-        
+
         # Convert SMILES to molecule
         mol = Chem.MolFromSmiles(smiles)
         if mol is None:
             raise ValueError(f"Invalid SMILES: {smiles}")
-        
-        # Add hydrogens
-        mol = Chem.AddHs(mol)
-        num_atoms = mol.GetNumAtoms()
-        
-        print(f"[Ligand Prep] Generating 3D structure for {num_atoms} atoms", file=sys.stderr)
-        
-        # Use ETKDG for conformer generation
-        params = AllChem.ETKDGv3()
-        params.randomSeed = 42
-        params.numThreads = 1  # Limit threads to save memory
-        
-        # Embed molecule
-        result = AllChem.EmbedMolecule(mol, params)
-        if result == -1:
-            params.useRandomCoords = True
-            result = AllChem.EmbedMolecule(mol, params)
-            if result == -1:
-                raise ValueError("Failed to generate 3D coordinates")
-        
-        print(f"[Ligand Prep] Optimizing geometry...", file=sys.stderr)
-        
-        # Optimize (use UFF for faster/lighter processing)
-        AllChem.UFFOptimizeMolecule(mol, maxIters=1000)  # Reduced iterations
-        
-        # Prepare for docking
-        import warnings
-        warnings.filterwarnings('ignore', category=DeprecationWarning)
-        
-        preparator = MoleculePreparation()
-        mol_setups = preparator.prepare(mol)
-        
-        # Write PDBQT
-        try:
-            from meeko import PDBQTWriterLegacy
-            writer = PDBQTWriterLegacy()
+
+        canonical = Chem.MolToSmiles(mol)
+        pdbqt_string = _LIGAND_PDBQT_CACHE.get(canonical)
+
+        if pdbqt_string is None:
+            # Add hydrogens
+            mol = Chem.AddHs(mol)
+            num_atoms = mol.GetNumAtoms()
+
+            print(f"[Ligand Prep] Generating 3D structure for {num_atoms} atoms", file=sys.stderr)
+
+            # Embed a small conformer ensemble and keep the best one
+            _embed_best_conformer(mol)
+
+            # Prepare for docking
+            warnings.filterwarnings('ignore', category=DeprecationWarning)
+
+            preparator, writer = _get_prep()
+            mol_setups = preparator.prepare(mol)
+
             pdbqt_string = writer.write_string(mol_setups[0])[0]
-            with open(output_file, 'w') as f:
-                f.write(pdbqt_string)
-        except:
-            preparator.write_pdbqt_file(output_file)
-        
-        # Cleanup
-        del mol, preparator, mol_setups
-        gc.collect()
-        
+            if len(_LIGAND_PDBQT_CACHE) >= _LIGAND_PDBQT_CACHE_MAX:
+                _LIGAND_PDBQT_CACHE.pop(next(iter(_LIGAND_PDBQT_CACHE)))
+            _LIGAND_PDBQT_CACHE[canonical] = pdbqt_string
+        else:
+            print(f"[Ligand Prep] ✅ Reusing prepared ligand for {canonical}", file=sys.stderr)
+
+        # Write PDBQT
+        with open(output_file, 'w') as f:
+            f.write(pdbqt_string)
+
         return True
     except Exception as e:
         raise Exception(f"SMILES to PDBQT conversion failed: {str(e)}")
 
+# Shared Meeko/RDKit state: MoleculePreparation compiles its SMARTS
+# tables on construction (tens of ms) and ETKDGv3() rebuilds the CSD
+# torsion tables, so one instance of each is built lazily and reused
+# by every ligand - both in-process calls and each pool worker
+_PREP = None
+_WRITER = None
+_ETKDG_PARAMS = None
+_ETKDG_PARAMS_RAND = None
+
+def _get_prep():
+    """(MoleculePreparation, PDBQTWriterLegacy) pair, built on first use"""
+    global _PREP, _WRITER
+    if _PREP is None:
+        from meeko import MoleculePreparation, PDBQTWriterLegacy
+        _PREP = MoleculePreparation()
+        _WRITER = PDBQTWriterLegacy()
+    return _PREP, _WRITER
+
+def _etkdg(use_random_coords=False):
+    """
+    Shared seeded ETKDGv3 parameter set, built on first use
+
+    EmbedMolecule does not mutate the params object, so reuse is safe;
+    the random-coords retry variant is cached separately rather than
+    flipping a flag on the shared instance.
+    """
+    global _ETKDG_PARAMS, _ETKDG_PARAMS_RAND
+    if _ETKDG_PARAMS is None:
+        from rdkit.Chem import AllChem
+        _ETKDG_PARAMS = AllChem.ETKDGv3()
+        _ETKDG_PARAMS.randomSeed = 42
+        _ETKDG_PARAMS.numThreads = 1  # Limit threads to save memory
+        _ETKDG_PARAMS_RAND = AllChem.ETKDGv3()
+        _ETKDG_PARAMS_RAND.randomSeed = 42
+        _ETKDG_PARAMS_RAND.numThreads = 1
+        _ETKDG_PARAMS_RAND.useRandomCoords = True
+    return _ETKDG_PARAMS_RAND if use_random_coords else _ETKDG_PARAMS
+
+def _embed_best_conformer(mol):
+    """
+    Embed a small ETKDG conformer ensemble and keep the lowest-energy one
+
+    A single embed ships whatever geometry ETKDG produced first; a few
+    conformers (scaled by flexibility) minimized in parallel and pruned
+    to the force-field minimum give Vina a better starting pose through
+    the same downstream path. MMFFOptimizeMoleculeConfs fans the
+    minimizations across cores; molecules MMFF cannot type fall back to
+    UFF. The ensemble is capped small to respect the memory budget.
+
+    Mutates mol in place, leaving exactly one conformer.
+    """
+    from rdkit import Chem
+    from rdkit.Chem import AllChem
+    from rdkit.Chem.rdMolDescriptors import CalcNumRotatableBonds
+
+    rot_bonds = CalcNumRotatableBonds(mol)
+    num_confs = min(8, 2 + rot_bonds)
+    cids = AllChem.EmbedMultipleConfs(mol, numConfs=num_confs, params=_etkdg())
+    if not cids:
+        cids = AllChem.EmbedMultipleConfs(mol, numConfs=num_confs,
+                                          params=_etkdg(use_random_coords=True))
+        if not cids:
+            raise ValueError("Failed to generate 3D coordinates")
+
+    # ETKDG geometry is already near the minimum, so drug-sized ligands
+    # converge in a few hundred steps: budget by flexibility instead of
+    # a flat worst-case cap, with a token polish for rigid fragments
+    if mol.GetNumHeavyAtoms() < 10:
+        max_its = 50
+    else:
+        max_its = 200 + 50 * rot_bonds
+
+    use_mmff = AllChem.MMFFHasAllMoleculeParams(mol)
+    if use_mmff:
+        energies = AllChem.MMFFOptimizeMoleculeConfs(
+            mol, numThreads=0, maxIters=max_its, mmffVariant='MMFF94s')
+    else:
+        energies = AllChem.UFFOptimizeMoleculeConfs(
+            mol, numThreads=0, maxIters=max_its)
+
+    # Each entry is (not_converged, energy); prefer converged conformers
+    converged = [(e, cid) for (ok, e), cid in zip(energies, cids) if ok == 0]
+    scored = converged or [(e, cid) for (ok, e), cid in zip(energies, cids)]
+    best_cid = min(scored)[1]
+
+    # Escalate only when nothing converged, and only for the winner -
+    # the discarded conformers never earn the extra iterations
+    if not converged:
+        if use_mmff:
+            AllChem.MMFFOptimizeMolecule(mol, confId=best_cid,
+                                         maxIters=2000, mmffVariant='MMFF94s')
+        else:
+            AllChem.UFFOptimizeMolecule(mol, confId=best_cid, maxIters=2000)
+
+    if len(cids) > 1:
+        best_conf = Chem.Conformer(mol.GetConformer(best_cid))
+        mol.RemoveAllConformers()
+        mol.AddConformer(best_conf, assignId=True)
+    return mol
+
+def _ligand_worker_init():
+    """Import RDKit/Meeko and build the shared prep objects once per worker"""
+    _get_prep()
+    _etkdg()
+
+def _smiles_to_pdbqt_worker(smiles, output_file):
+    """Prepare one ligand reusing the worker's cached RDKit/Meeko state"""
+    from rdkit import Chem
+
+    mol = Chem.MolFromSmiles(smiles)
+    if mol is None:
+        raise ValueError(f"Invalid SMILES: {smiles}")
+
+    mol = Chem.AddHs(mol)
+    _embed_best_conformer(mol)
+
+    prep, writer = _get_prep()
+    mol_setups = prep.prepare(mol)
+    pdbqt_string = writer.write_string(mol_setups[0])[0]
+    with open(output_file, 'w') as f:
+        f.write(pdbqt_string)
+
+    return output_file
+
+def batch_smiles_to_pdbqt(smiles_list, out_dir, n_workers=None):
+    """
+    Convert many SMILES to PDBQT files using a persistent worker pool
+
+    smiles_to_pdbqt pays the RDKit/Meeko cold start (~0.5 s) and
+    rebuilds MoleculePreparation's SMARTS tables on every call, which
+    dominates virtual-screening workloads. Here each pool worker does
+    that setup once in its initializer and then streams through
+    ligands, scaling near-linearly with cores.
+
+    Returns a list aligned with smiles_list: the output path for each
+    ligand that prepared successfully, None for failures (which are
+    logged to stderr rather than aborting the batch).
+    """
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    paths = [str(out_dir / f'ligand_{i}.pdbqt') for i in range(len(smiles_list))]
+    results = [None] * len(smiles_list)
+
+    with ProcessPoolExecutor(max_workers=n_workers,
+                             initializer=_ligand_worker_init) as pool:
+        futures = {
+            pool.submit(_smiles_to_pdbqt_worker, smiles, path): i
+            for i, (smiles, path) in enumerate(zip(smiles_list, paths))
+        }
+        for future in futures:
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                print(f"[Ligand Prep] Failed for {smiles_list[i]}: {e}", file=sys.stderr)
+
+    return results
+
+def run_pipeline(smiles_list, receptor_pdbqt, config, out_dir):
+    """
+    Dock many ligands against one receptor with prep and docking overlapped
+
+    The serial per-ligand flow (prep, then dock, then write) leaves the
+    CPU half idle: Vina saturates its core budget while RDKit/meeko sit
+    idle, and vice versa. Here a thread pool prepares ligands while the
+    main loop docks whichever ligand finished prep first (one dock at a
+    time - Vina already uses the configured CPUs) and a writer thread
+    streams rows into out_dir/results.csv, so per-ligand cost tends to
+    max(prep_time, dock_time) instead of their sum.
+
+    Returns a list of per-ligand dicts with smiles, status and, for
+    successful docks, the run_vina_docking result.
+    """
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    results_csv = out_dir / 'results.csv'
+
+    prep_workers = max(1, (os.cpu_count() or 2) // 2)
+    sink = queue.Queue(maxsize=2 * prep_workers)
+
+    def _writer():
+        with open(results_csv, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['smiles', 'ligand_pdbqt', 'status', 'best_affinity'])
+            while True:
+                row = sink.get()
+                if row is None:
+                    break
+                writer.writerow(row)
+
+    writer_thread = threading.Thread(target=_writer)
+    writer_thread.start()
+
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers=prep_workers) as pool:
+            futures = {}
+            for i, smiles in enumerate(smiles_list):
+                path = str(out_dir / f'ligand_{i}.pdbqt')
+                futures[pool.submit(smiles_to_pdbqt, smiles, path)] = (smiles, path)
+
+            for future in as_completed(futures):
+                smiles, path = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"[Pipeline] Ligand prep failed for {smiles}: {e}", file=sys.stderr)
+                    sink.put([smiles, path, 'prep_failed', ''])
+                    results.append({'smiles': smiles, 'status': 'prep_failed'})
+                    continue
+
+                try:
+                    result = run_vina_docking(receptor_pdbqt, path, config)
+                    sink.put([smiles, path, 'success', result['best_affinity']])
+                    results.append({'smiles': smiles, 'status': 'success', 'result': result})
+                except Exception as e:
+                    print(f"[Pipeline] Docking failed for {smiles}: {e}", file=sys.stderr)
+                    sink.put([smiles, path, 'dock_failed', ''])
+                    results.append({'smiles': smiles, 'status': 'dock_failed'})
+    finally:
+        sink.put(None)
+        writer_thread.join()
+
+    print(f"[Pipeline] Results written to {results_csv}", file=sys.stderr)
+    return results
+
+# Receptor-fallback typing tables. AutoDock types by element (protein
+# oxygens and sulfurs are H-bond acceptors), with ring carbons in the
+# aromatic residues promoted to type 'A'.
+_AD_TYPE_MAP = {'C': 'C', 'N': 'N', 'O': 'OA', 'S': 'SA', 'H': 'HD'}
+_AROMATIC_RING_CARBONS = {
+    'PHE': {'CG', 'CD1', 'CD2', 'CE1', 'CE2', 'CZ'},
+    'TYR': {'CG', 'CD1', 'CD2', 'CE1', 'CE2', 'CZ'},
+    'TRP': {'CG', 'CD1', 'CD2', 'CE2', 'CE3', 'CZ2', 'CZ3', 'CH2'},
+    'HIS': {'CG', 'CD2', 'CE1'}
+}
+
+# Kollman-style backbone partial charges, keyed by atom name. Vina's
+# scoring function ignores the charge column entirely, so a constant
+# lookup table (zero for side-chain atoms) docks identically to the
+# old whole-protein Gasteiger computation.
+_KOLLMAN_BACKBONE = {
+    'N': -0.463, 'CA': 0.035, 'C': 0.616, 'O': -0.504,
+    'OXT': -0.706, 'H': 0.252, 'HA': 0.048
+}
+
 def pdb_to_pdbqt_biopython(pdb_content, output_file):
     """
-    Fallback: Convert PDB to PDBQT using RDKit directly (without Meeko)
-    
-    MEMORY OPTIMIZED: Processes in chunks and cleans up immediately
+    Fallback: Convert PDB to PDBQT with BioPython + NumPy only
+
+    The old path round-tripped the whole protein through RDKit -
+    AddHs(addCoords=True) and ComputeGasteigerCharges on a 10k-atom
+    receptor cost hundreds of MB and most of the prep time - even
+    though Vina never reads the charge column. This version walks the
+    structure once, assigns AutoDock types from element + residue
+    tables, and writes the file in one shot.
     """
     try:
-        from Bio.PDB import PDBParser, PDBIO, Select
-        from io import StringIO
-        from rdkit import Chem
-        from rdkit.Chem import AllChem
-        import gc
-        
-        print(f"[Receptor Prep RDKit] Converting PDB to PDBQT (memory-optimized)", file=sys.stderr)
-        
-        # Parse PDB and extract protein only (no waters, ligands, ions)
-        class ProteinSelect(Select):
-            def accept_residue(self, residue):
-                # Accept only standard amino acids
-                return residue.id[0] == ' '
-        
+        from Bio.PDB import PDBParser
+
+        print(f"[Receptor Prep] Converting PDB to PDBQT (BioPython fallback)", file=sys.stderr)
+
         parser = PDBParser(QUIET=True)
         structure = parser.get_structure('protein', StringIO(pdb_content))
-        
-        # Write cleaned PDB (protein only)
-        temp_pdb = output_file.replace('.pdbqt', '_clean.pdb')
-        io = PDBIO()
-        io.set_structure(structure)
-        io.save(temp_pdb, ProteinSelect())
-        
-        # Free memory immediately
-        del structure, parser, io
-        gc.collect()
-        
-        print(f"[Receptor Prep RDKit] Loading molecule...", file=sys.stderr)
-        
-        # Read with RDKit (don't sanitize to save memory)
-        mol = Chem.MolFromPDBFile(temp_pdb, removeHs=True, sanitize=False)  # Remove H first
-        if mol is None:
-            raise Exception("Failed to parse PDB with RDKit")
-        
-        num_atoms_initial = mol.GetNumAtoms()
-        print(f"[Receptor Prep RDKit] Loaded {num_atoms_initial} atoms", file=sys.stderr)
-        
-        # Add only polar hydrogens (saves memory)
-        mol = Chem.AddHs(mol, addCoords=True, onlyOnAtoms=None)
-        print(f"[Receptor Prep RDKit] Now {mol.GetNumAtoms()} atoms with H", file=sys.stderr)
-        
-        # Compute Gasteiger charges in chunks to reduce memory
-        print(f"[Receptor Prep RDKit] Computing charges...", file=sys.stderr)
-        AllChem.ComputeGasteigerCharges(mol)
-        
-        # Write PDBQT in streaming mode (don't build huge array in memory)
-        print(f"[Receptor Prep RDKit] Writing PDBQT...", file=sys.stderr)
-        
-        with open(output_file, 'w') as f:
-            f.write("REMARK  Receptor prepared with RDKit (MGLTools fallback)\n")
-            
-            conf = mol.GetConformer()
-            chunk_size = 500  # Process 500 atoms at a time
-            total_atoms = mol.GetNumAtoms()
-            
-            for chunk_start in range(0, total_atoms, chunk_size):
-                chunk_end = min(chunk_start + chunk_size, total_atoms)
-                
-                # Process chunk
-                for atom_idx in range(chunk_start, chunk_end):
-                    atom = mol.GetAtomWithIdx(atom_idx)
-                    pos = conf.GetAtomPosition(atom_idx)
-                    
-                    # Get atom properties
-                    atom_name = atom.GetSymbol()
-                    residue_name = "UNK"
-                    chain_id = "A"
-                    residue_num = 1
-                    
-                    # Try to get PDB info if available
-                    if atom.HasProp('_Name'):
-                        atom_name = atom.GetProp('_Name')
-                    if atom.GetMonomerInfo():
-                        residue_name = atom.GetMonomerInfo().GetResidueName()
-                        residue_num = atom.GetMonomerInfo().GetResidueNumber()
-                        chain_id = atom.GetMonomerInfo().GetChainId()
-                    
-                    # Get charge
-                    charge = 0.0
-                    if atom.HasProp('_GasteigerCharge'):
-                        try:
-                            charge = float(atom.GetProp('_GasteigerCharge'))
-                            if charge != charge:  # NaN check
-                                charge = 0.0
-                        except:
-                            charge = 0.0
-                    
-                    # Determine AutoDock atom type
-                    symbol = atom.GetSymbol()
-                    if symbol == 'C':
-                        atom_type = 'A' if atom.GetIsAromatic() else 'C'
-                    elif symbol == 'N':
-                        atom_type = 'NA' if atom.GetIsAromatic() else 'N'
-                    elif symbol == 'O':
-                        atom_type = 'OA' if atom.GetTotalValence() >= 2 else 'O'
-                    elif symbol == 'S':
-                        atom_type = 'SA'
-                    elif symbol == 'H':
-                        atom_type = 'HD'
-                    else:
-                        atom_type = symbol
-                    
-                    # Write PDBQT line directly to file
-                    line = f"ATOM  {atom_idx+1:5d} {atom_name:^4s} {residue_name:3s} {chain_id:1s}{residue_num:4d}    "
-                    line += f"{pos.x:8.3f}{pos.y:8.3f}{pos.z:8.3f}  1.00  0.00    "
-                    line += f"{charge:6.3f} {atom_type:2s}\n"
-                    f.write(line)
-                
-                # Print progress for large proteins
-                if total_atoms > 1000:
-                    progress = int((chunk_end / total_atoms) * 100)
-                    print(f"[Receptor Prep RDKit] Writing: {progress}% ({chunk_end}/{total_atoms} atoms)", file=sys.stderr)
-            
-            f.write("TER\nENDMDL\n")
-        
-        print(f"[Receptor Prep RDKit] ✅ PDBQT created ({total_atoms} atoms)", file=sys.stderr)
-        
-        # Cleanup memory aggressively
-        del mol, conf
-        gc.collect()
-        
-        # Remove temp file
-        if os.path.exists(temp_pdb):
-            os.remove(temp_pdb)
-        
+
+        # Single pass over standard residues only (no waters, ligands,
+        # ions), collecting parallel arrays
+        names = []
+        resnames = []
+        chains = []
+        resnums = []
+        elements = []
+        coords = []
+        for chain in structure[0]:
+            for residue in chain:
+                if residue.id[0] != ' ':
+                    continue
+                resname = residue.resname.strip()
+                for atom in residue:
+                    name = atom.get_name()
+                    element = (atom.element or name[:1]).strip().upper()
+                    names.append(name)
+                    resnames.append(resname)
+                    chains.append(chain.id)
+                    resnums.append(residue.id[1])
+                    elements.append(element)
+                    coords.append(atom.coord)
+
+        total_atoms = len(names)
+        if total_atoms == 0:
+            raise Exception("No protein atoms found in PDB")
+
+        del structure, parser
+        coords = np.asarray(coords, dtype=np.float64)
+
+        print(f"[Receptor Prep] Typing {total_atoms} atoms...", file=sys.stderr)
+
+        ring_carbons = _AROMATIC_RING_CARBONS
+        atom_types = [
+            'A' if name in ring_carbons.get(resname, ())
+            else _AD_TYPE_MAP.get(element, element)
+            for name, resname, element in zip(names, resnames, elements)
+        ]
+        charges = [_KOLLMAN_BACKBONE.get(name, 0.0) for name in names]
+
+        lines = [
+            f"ATOM  {i+1:5d} {names[i]:^4s} {resnames[i]:3s} {chains[i]:1s}{resnums[i]:4d}    "
+            f"{coords[i, 0]:8.3f}{coords[i, 1]:8.3f}{coords[i, 2]:8.3f}  1.00  0.00    "
+            f"{charges[i]:6.3f} {atom_types[i]:2s}"
+            for i in range(total_atoms)
+        ]
+
+        # Assemble the whole file in one buffer and hand the kernel a
+        # single binary write - no text-layer encoding per chunk and no
+        # per-line syscall pressure
+        pdbqt = (
+            "REMARK  Receptor prepared with BioPython (MGLTools fallback)\n"
+            + "\n".join(lines) + "\nTER\nENDMDL\n"
+        ).encode('ascii')
+        with open(output_file, 'wb') as f:
+            f.write(pdbqt)
+
+        print(f"[Receptor Prep] ✅ PDBQT created ({total_atoms} atoms)", file=sys.stderr)
+
         return True
-        
+
     except Exception as e:
-        print(f"[Receptor Prep RDKit Error] {str(e)}", file=sys.stderr)
-        import traceback
-        print(f"[Receptor Prep RDKit Traceback] {traceback.format_exc()}", file=sys.stderr)
-        raise Exception(f"RDKit PDB to PDBQT conversion failed: {str(e)}")
+        print(f"[Receptor Prep Error] {str(e)}", file=sys.stderr)
+        print(f"[Receptor Prep Traceback] {traceback.format_exc()}", file=sys.stderr)
+        raise Exception(f"PDB to PDBQT conversion failed: {str(e)}")
+
+def _pdb_to_pdbqt_meeko(pdb_content, output_file):
+    """
+    Prepare the receptor in-process with meeko >= 0.6
+
+    Replaces the Python-2 prepare_receptor4.py subprocess: no fork, no
+    MGLTools cold import (~1-3 s per receptor), and meeko writes
+    well-formed coordinate columns so the repair pass is unnecessary.
+    Raises ImportError on older meeko without the Polymer API.
+    """
+    from meeko import (MoleculePreparation, PDBQTWriterLegacy, Polymer,
+                       ResidueChemTemplates)
+
+    print(f"[Receptor Prep] Using in-process meeko receptor prep", file=sys.stderr)
+
+    templates = ResidueChemTemplates.create_from_defaults()
+    polymer = Polymer.from_pdb_string(pdb_content, templates, MoleculePreparation())
+    pdbqt_strings = PDBQTWriterLegacy.write_string_from_polymer(polymer)
+    rigid_pdbqt = pdbqt_strings[0] if isinstance(pdbqt_strings, tuple) else pdbqt_strings
+
+    with open(output_file, 'w') as f:
+        f.write(rigid_pdbqt)
+
+    print(f"[Receptor Prep] ✅ PDBQT created with meeko", file=sys.stderr)
+    return True
+
+# Prepared receptors keyed by content hash: across screening batches
+# the backend re-submits the same receptor PDB, and without a cache the
+# whole MGLTools pipeline (~2-5 s) re-ran every time
+_RECEPTOR_CACHE_DIR = Path(tempfile.gettempdir()) / 'proteindock_receptor_cache'
+
+# Views derived from the receptor text, shared across pipeline stages
+_RECEPTOR_INDEX_CACHE = {}
+
+def _receptor_index(pdb_content):
+    """
+    Per-receptor views derived from a single pass over the PDB text
+
+    Returns {'body': str, 'ca_coords': ndarray}: 'body' is the text with
+    END records stripped, ready to head a complex file; 'ca_coords' the
+    C-alpha positions. Grid detection and complex assembly both consume
+    the same receptor within one job (and across jobs on a warm server),
+    so the text is split exactly once instead of once per stage. Keyed
+    by blake2b digest so the cache never pins the raw text as a key.
+    """
+
+    key = hashlib.blake2b(pdb_content.encode(), digest_size=16).digest()
+    index = _RECEPTOR_INDEX_CACHE.get(key)
+    if index is None:
+        index = {
+            'body': ''.join(line for line in pdb_content.splitlines(keepends=True)
+                            if not line.startswith('END')),
+            'ca_coords': _extract_ca_coords(pdb_content),
+        }
+        if len(_RECEPTOR_INDEX_CACHE) >= 4:
+            _RECEPTOR_INDEX_CACHE.pop(next(iter(_RECEPTOR_INDEX_CACHE)))
+        _RECEPTOR_INDEX_CACHE[key] = index
+    return index
 
 def pdb_to_pdbqt(pdb_content, output_file):
+    """
+    Convert PDB to PDBQT, caching the result by receptor content hash
+
+    The actual preparation is delegated to _pdb_to_pdbqt_uncached;
+    repeat calls with identical PDB content (one receptor, many ligand
+    batches) cost a blake2b hash (<1 ms per MB) and a file copy.
+    """
+
+    key = hashlib.blake2b(pdb_content.encode(), digest_size=16).hexdigest()
+    cached = _RECEPTOR_CACHE_DIR / f'{key}.pdbqt'
+
+    if cached.exists():
+        print(f"[Receptor Prep] ✅ Reusing cached PDBQT ({key[:8]})", file=sys.stderr)
+        shutil.copyfile(cached, output_file)
+        return True
+
+    result = _pdb_to_pdbqt_uncached(pdb_content, output_file)
+
+    if result:
+        try:
+            _RECEPTOR_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(output_file, cached)
+        except OSError:
+            pass  # cache dir not writable - prepare again next call
+
+    return result
+
+def _pdb_to_pdbqt_obabel(pdb_content, output_file):
+    """
+    Convert PDB to rigid-receptor PDBQT by piping through obabel
+
+    The PDB goes to obabel's stdin and the PDBQT comes back on stdout
+    (-xr: rigid receptor, no ROOT/BRANCH tree), so the conversion costs
+    one process and no temp-file round trip.
+    """
+    obabel = shutil.which('obabel')
+    if obabel is None:
+        raise FileNotFoundError('obabel not on PATH')
+
+    result = subprocess.run(
+        [obabel, '-ipdb', '-opdbqt', '-xr', '--partialcharge', 'gasteiger'],
+        input=pdb_content.encode('ascii', errors='replace'),
+        capture_output=True, timeout=120
+    )
+    if result.returncode != 0 or not result.stdout.strip():
+        raise Exception(
+            f"obabel failed: {result.stderr.decode('ascii', errors='replace')[:200]}")
+
+    with open(output_file, 'wb') as f:
+        f.write(result.stdout)
+    return True
+
+def _fix_pdbqt_coords_slow(lines, idx):
+    """Per-line repair for files whose coordinate columns are ragged"""
+    fixes = 0
+    for i in idx:
+        line = lines[i]
+        parts = line[30:54].split()
+        if len(parts) >= 3:
+            try:
+                x, y, z = float(parts[0]), float(parts[1]), float(parts[2])
+            except ValueError:
+                continue
+            fixed = f"{x:8.3f}{y:8.3f}{z:8.3f}"
+            if fixed != line[30:54]:
+                lines[i] = line[:30] + fixed + line[54:]
+                fixes += 1
+    return '\n'.join(lines), fixes
+
+def _fix_pdbqt_coords(content):
+    """
+    Repair malformed PDBQT coordinate columns (MGLTools bug with some
+    PDB files) as one bulk NumPy parse instead of a per-line loop
+
+    Coordinate records are a fixed-width numeric table: the three
+    8-char columns are sliced out of every ATOM/HETATM line at once,
+    parsed with a single astype, and re-rendered with vectorized
+    '%8.3f' formatting, so the interpreter never runs float() or an
+    f-string per line. Lines whose canonical rendering already matches
+    are left alone, and a clean file comes back byte-identical with
+    fixes_applied == 0 so the caller can skip the rewrite entirely.
+
+    Returns (content, fixes_applied).
+    """
+    lines = content.split('\n')
+    idx = [i for i, ln in enumerate(lines)
+           if len(ln) >= 54 and ln.startswith(('ATOM', 'HETATM'))]
+    if not idx:
+        return content, 0
+
+    raw = np.array([lines[i][30:54] for i in idx])
+    chars = raw.view('U1').reshape(len(raw), 24)
+    try:
+        xyz = np.stack([
+            np.ascontiguousarray(chars[:, c:c + 8]).view('U8').ravel()
+              .astype(np.float64)
+            for c in (0, 8, 16)
+        ], axis=1)
+    except ValueError:
+        # Columns don't align as three clean floats on every line -
+        # repair the odd ones one at a time
+        return _fix_pdbqt_coords_slow(lines, idx)
+
+    rendered = np.char.mod('%8.3f', xyz)
+    fixed = np.char.add(np.char.add(rendered[:, 0], rendered[:, 1]),
+                        rendered[:, 2])
+    diff = np.flatnonzero(fixed != raw)
+    if diff.size == 0:
+        return content, 0
+
+    for j in diff:
+        i = idx[j]
+        lines[i] = lines[i][:30] + str(fixed[j]) + lines[i][54:]
+    return '\n'.join(lines), int(diff.size)
+
+def _pdb_to_pdbqt_uncached(pdb_content, output_file):
     """
     Convert PDB to PDBQT using MGLTools AutoDockTools prepare_receptor4.py
-    
+
     This is the GOLD STANDARD receptor preparation tool from AutoDockTools.
     Creates proper PDBQT files with correct atom types, hydrogens, and Gasteiger charges.
-    
+
     Uses bundled MGLTools scripts included in the repository.
     """
+    # Prefer meeko's in-process receptor prep when it's available -
+    # same PDBQT semantics without the per-receptor subprocess cost
+    try:
+        return _pdb_to_pdbqt_meeko(pdb_content, output_file)
+    except (ImportError, AttributeError):
+        print(f"[Receptor Prep] meeko receptor prep unavailable, using MGLTools", file=sys.stderr)
+    except Exception as e:
+        print(f"[Receptor Prep] meeko receptor prep failed ({e}), using MGLTools", file=sys.stderr)
+
     try:
-        import subprocess
-        import tempfile
-        import platform
-        
         print(f"[Receptor Prep] Using AutoDockTools prepare_receptor4.py", file=sys.stderr)
         
-        # Write PDB to temporary file
+        # Write PDB to temporary file: one pre-encoded bytes blob
+        # through a 1 MiB buffer, skipping the text layer entirely
         temp_pdb = output_file.replace('.pdbqt', '_input.pdb')
-        with open(temp_pdb, 'w') as f:
-            f.write(pdb_content)
+        with open(temp_pdb, 'wb', buffering=1 << 20) as f:
+            f.write(pdb_content.encode('ascii', errors='replace'))
         
         # Detect platform and set MGLTools paths accordingly
         script_dir = Path(__file__).parent
         system = platform.system()
         
         if system == 'Windows':
-            # Windows: Use installed MGLTools
-            mgltools_path = r"C:\Program Files (x86)\MGLTools-1.5.7\Lib\site-packages\AutoDockTools\Utilities24"
-            prepare_receptor = os.path.join(mgltools_path, "prepare_receptor4.py")
-            mgltools_python = r"C:\Program Files (x86)\MGLTools-1.5.7\python.exe"
+            # Windows: Use installed MGLTools (paths resolved at import)
+            prepare_receptor = str(_MGLTOOLS_WIN_UTIL / "prepare_receptor4.py")
+            mgltools_python = str(_MGLTOOLS_WIN_PY)
         else:
             # Linux/Render: Use bundled MGLTools scripts from repo
             mgltools_path = script_dir / "mgltools" / "AutoDockTools" / "Utilities24"
             prepare_receptor = mgltools_path / "prepare_receptor4.py"
-            # MGLTools scripts are Python 2 - try python2.7, python2, or fallback to conversion
-            mgltools_python = None
-            for py2_cmd in ['python2.7', 'python2', '/usr/bin/python2.7', '/usr/bin/python2']:
-                try:
-                    result = subprocess.run([py2_cmd, '--version'], capture_output=True, timeout=2)
-                    if result.returncode == 0:
-                        mgltools_python = py2_cmd
-                        print(f"[Receptor Prep] Found Python 2: {py2_cmd}", file=sys.stderr)
-                        break
-                except (FileNotFoundError, subprocess.TimeoutExpired):
-                    continue
-            
-            if not mgltools_python:
-                # No Python 2 available - will use fallback RDKit conversion
+            # MGLTools scripts are Python 2 - the interpreter scan is
+            # memoized so repeat receptor preps skip the probe spawns
+            mgltools_python = _find_python2()
+            if mgltools_python:
+                print(f"[Receptor Prep] Found Python 2: {mgltools_python}", file=sys.stderr)
+            else:
+                # No Python 2 available - will use fallback conversion
                 print(f"[Receptor Prep] Python 2 not available, using RDKit fallback", file=sys.stderr)
         
         print(f"[Receptor Prep] Platform: {system}", file=sys.stderr)
         print(f"[Receptor Prep] Script path: {prepare_receptor}", file=sys.stderr)
         
-        # If Python 2 not available on Linux, use RDKit fallback
+        # If Python 2 not available on Linux, pipe through obabel (reads
+        # stdin, writes stdout, no temp-file round trip) before falling
+        # back to the simple Biopython writer
         if system != 'Windows' and not mgltools_python:
-            print(f"[Receptor Prep] Using RDKit fallback (no Python 2)", file=sys.stderr)
+            try:
+                return _pdb_to_pdbqt_obabel(pdb_content, output_file)
+            except Exception as e:
+                print(f"[Receptor Prep] obabel unavailable ({e}), using Biopython fallback", file=sys.stderr)
             return pdb_to_pdbqt_biopython(pdb_content, output_file)
         
         if not os.path.exists(prepare_receptor):
@@ -384,61 +871,49 @@ def pdb_to_pdbqt(pdb_content, output_file):
             env['PYTHONPATH'] = str(mgltools_base) + os.pathsep + env.get('PYTHONPATH', '')
             print(f"[Receptor Prep] PYTHONPATH: {env['PYTHONPATH']}", file=sys.stderr)
         
+        # Bytes pipes: the output is only decoded when something needs
+        # printing, so the success path skips the Unicode round-trip
         result = subprocess.run(
             cmd,
             capture_output=True,
-            text=True,
             timeout=120,
             cwd=os.path.dirname(output_file),
             env=env  # Pass environment with PYTHONPATH
         )
-        
+
         if result.returncode != 0:
-            print(f"[Receptor Prep] stderr: {result.stderr}", file=sys.stderr)
-            print(f"[Receptor Prep] stdout: {result.stdout}", file=sys.stderr)
-            raise Exception(f"prepare_receptor4.py failed: {result.stderr}")
-        
-        print(f"[Receptor Prep] stdout: {result.stdout}", file=sys.stderr)
+            stderr_text = result.stderr.decode('utf-8', errors='replace')
+            print(f"[Receptor Prep] stderr: {stderr_text}", file=sys.stderr)
+            print(f"[Receptor Prep] stdout: {result.stdout.decode('utf-8', errors='replace')}", file=sys.stderr)
+            raise Exception(f"prepare_receptor4.py failed: {stderr_text}")
+
+        if _VERBOSE:
+            print(f"[Receptor Prep] stdout: {result.stdout.decode('utf-8', errors='replace')}", file=sys.stderr)
         
-        # Verify output file was created
-        if not os.path.exists(output_file):
+        # Verify the output exists and has content with a single stat,
+        # then read it once for the coordinate-repair scan
+        try:
+            output_stat = os.stat(output_file)
+        except FileNotFoundError:
             raise Exception(f"Output PDBQT file not created: {output_file}")
-        
-        # Verify it has content and fix formatting issues
+        if output_stat.st_size < 100:
+            raise Exception(f"Output PDBQT file is too small: {output_stat.st_size} bytes")
+
         with open(output_file, 'r') as f:
             content = f.read()
-            if len(content) < 100:
-                raise Exception(f"Output PDBQT file is too small: {len(content)} bytes")
         
         # Fix malformed PDBQT coordinates (MGLTools bug with some PDB files)
-        fixed_lines = []
-        fixes_applied = 0
-        for line in content.split('\n'):
-            if line.startswith('ATOM') or line.startswith('HETATM'):
-                # Check if coordinate fields are properly formatted
-                # PDBQT format: columns 31-38 (x), 39-46 (y), 47-54 (z)
-                if len(line) >= 54:
-                    try:
-                        # Extract coordinate substring
-                        coords_str = line[30:54]
-                        # Try to parse as three floats
-                        parts = coords_str.split()
-                        if len(parts) >= 3:
-                            x, y, z = float(parts[0]), float(parts[1]), float(parts[2])
-                            # Rebuild line with proper formatting
-                            fixed_line = line[:30] + f"{x:8.3f}{y:8.3f}{z:8.3f}" + line[54:]
-                            fixed_lines.append(fixed_line)
-                            if coords_str != f"{x:8.3f}{y:8.3f}{z:8.3f}":
-                                fixes_applied += 1
-                            continue
-                    except (ValueError, IndexError):
-                        pass
-            fixed_lines.append(line)
-        
+        content, fixes_applied = _fix_pdbqt_coords(content)
+
         if fixes_applied > 0:
             print(f"[Receptor Prep] Fixed {fixes_applied} malformed coordinate lines", file=sys.stderr)
-            with open(output_file, 'w') as f:
-                f.write('\n'.join(fixed_lines))
+            # Write the repaired copy beside the original and swap it in
+            # atomically, so a crash mid-rewrite never leaves a truncated
+            # receptor for the cache to pick up
+            tmp_out = output_file + '.tmp'
+            with open(tmp_out, 'wb', buffering=1 << 20) as f:
+                f.write(content.encode('ascii', errors='replace'))
+            os.replace(tmp_out, output_file)
         
         print(f"[Receptor Prep] ✅ PDBQT created successfully with prepare_receptor4.py", file=sys.stderr)
         
@@ -450,7 +925,6 @@ def pdb_to_pdbqt(pdb_content, output_file):
         
     except Exception as e:
         print(f"[Receptor Prep Error] {str(e)}", file=sys.stderr)
-        import traceback
         print(f"[Receptor Prep Traceback] {traceback.format_exc()}", file=sys.stderr)
         raise Exception(f"PDB to PDBQT conversion failed: {str(e)}")
 
@@ -463,26 +937,14 @@ def run_vina_docking(receptor_pdbqt, ligand_pdbqt, config):
         ligand_pdbqt: Path to ligand PDBQT file
         config: Dictionary with docking parameters
     """
-    import subprocess
-    import tempfile
-    import gc
-    
     try:
         # Validate input files exist
         if not os.path.exists(receptor_pdbqt):
             raise Exception(f"Receptor file not found: {receptor_pdbqt}")
         if not os.path.exists(ligand_pdbqt):
             raise Exception(f"Ligand file not found: {ligand_pdbqt}")
-        
-        # Get Vina binary path
-        import platform
-        vina_bin_dir = Path(__file__).parent / 'vina_bin'
-        if platform.system() == 'Windows':
-            vina_bin_path = vina_bin_dir / 'vina.exe'
-        else:
-            vina_bin_path = vina_bin_dir / 'vina'
-        
-        if not vina_bin_path.exists():
+
+        if not _VINA_BIN_EXISTS:
             # Try Python vina as fallback
             try:
                 from vina import Vina
@@ -497,8 +959,8 @@ def run_vina_docking(receptor_pdbqt, ligand_pdbqt, config):
         n_poses = config.get('numPoses', 9)
         
         # MEMORY OPTIMIZATION: Limit CPU count and adjust exhaustivity
-        import multiprocessing
-        cpu_count = min(2, multiprocessing.cpu_count())  # Limit to 2 cores to save memory
+        # (run_vina_batch overrides cpu to 1 per worker process)
+        cpu_count = config.get('cpu', _DEFAULT_CPU)
         
         # Reduce exhaustivity if too high (saves memory)
         if exhaustiveness > 8:
@@ -517,79 +979,82 @@ def run_vina_docking(receptor_pdbqt, ligand_pdbqt, config):
         
         # Output file
         output_file = ligand_pdbqt.replace('.pdbqt', '_out.pdbqt')
-        
-        # Create config file
-        config_fd, config_file = tempfile.mkstemp(suffix='.txt', text=True)
-        try:
-            with os.fdopen(config_fd, 'w') as conf:
-                conf.write(f"receptor = {receptor_pdbqt}\n")
-                conf.write(f"ligand = {ligand_pdbqt}\n")
-                conf.write(f"center_x = {center['x']}\n")
-                conf.write(f"center_y = {center['y']}\n")
-                conf.write(f"center_z = {center['z']}\n")
-                conf.write(f"size_x = {size['x']}\n")
-                conf.write(f"size_y = {size['y']}\n")
-                conf.write(f"size_z = {size['z']}\n")
-                conf.write(f"exhaustiveness = {exhaustiveness}\n")
-                conf.write(f"cpu = {cpu_count}\n")
-                conf.write(f"num_modes = {n_poses}\n")
-                conf.write(f"out = {output_file}\n")
-                conf.flush()
-                os.fsync(conf.fileno())
-        except Exception:
-            os.close(config_fd)
-            raise
-        
+
+        # Everything goes on the command line - the old per-dock config
+        # file cost an mkstemp/write/fsync/unlink round-trip (the fsync
+        # alone is 1-10 ms on SSD) for parameters Vina accepts as args
+        cmd = [
+            str(_VINA_BIN),
+            '--receptor', receptor_pdbqt,
+            '--ligand', ligand_pdbqt,
+            '--center_x', str(center['x']),
+            '--center_y', str(center['y']),
+            '--center_z', str(center['z']),
+            '--size_x', str(size['x']),
+            '--size_y', str(size['y']),
+            '--size_z', str(size['z']),
+            '--exhaustiveness', str(exhaustiveness),
+            '--cpu', str(cpu_count),
+            '--num_modes', str(n_poses),
+            '--out', output_file
+        ]
+
         print(f"[Vina] Using {cpu_count} cores, exhaustivity={exhaustiveness}, poses={n_poses}", file=sys.stderr)
-        
+
         # Start Vina (no progress monitoring to save memory)
         print(f"[Vina] Starting docking...", file=sys.stderr)
-        
+
         process = subprocess.Popen(
-            [str(vina_bin_path), '--config', config_file],
+            cmd,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
-            text=True
+            text=True,
+            bufsize=1
         )
-        
-        # Wait for completion (15 min timeout for memory-limited environment)
+
+        # Parse the pose table while streaming stdout instead of
+        # buffering it all via communicate() - at high exhaustiveness
+        # the progress output runs to tens of MB, and the streaming
+        # parse keeps memory at O(num_poses). The pre-compiled pattern
+        # matches table rows like "   1        -7.5      0.000   0.000"
+        # in one C-level scan per line, and stderr is drained on a
+        # background thread so neither pipe can fill up and deadlock.
+        stderr_chunks = []
+        drainer = threading.Thread(
+            target=lambda: stderr_chunks.append(process.stderr.read()),
+            daemon=True
+        )
+        drainer.start()
+
+        # 15 min timeout for memory-limited environment
+        timer = threading.Timer(900, process.kill)
+        timer.start()
+
+        poses = []
         try:
-            stdout, stderr = process.communicate(timeout=900)  # 15 min timeout
-        except subprocess.TimeoutExpired:
-            process.kill()
-            stdout, stderr = process.communicate()
+            for line in process.stdout:
+                match = _POSE_LINE_RE.match(line)
+                if match:
+                    poses.append({
+                        'poseId': int(match.group(1)),
+                        'score': float(match.group(2)),
+                        'rmsd_lb': float(match.group(3)),
+                        'rmsd_ub': float(match.group(4))
+                    })
+            process.wait()
+            drainer.join()
+        finally:
+            timed_out = not timer.is_alive()
+            timer.cancel()
+
+        if timed_out:
             raise Exception(f"Vina timed out after 15 minutes")
-        
-        # Cleanup
-        os.unlink(config_file)
-        gc.collect()
-        
+
         if process.returncode != 0:
-            raise Exception(f"Vina execution failed: {stderr}")
-        
+            raise Exception(f"Vina execution failed: {''.join(stderr_chunks)}")
+
         print(f"[Vina] Docking complete", file=sys.stderr)
-        
-        # Parse results from output
-        poses = []
-        for line in stdout.split('\n'):
-            # Look for lines like: "   1        -7.5      0.000      0.000"
-            parts = line.strip().split()
-            if len(parts) >= 2 and parts[0].isdigit():
-                try:
-                    pose_num = int(parts[0])
-                    affinity = float(parts[1])
-                    rmsd_lb = float(parts[2]) if len(parts) > 2 else 0.0
-                    rmsd_ub = float(parts[3]) if len(parts) > 3 else 0.0
-                    
-                    poses.append({
-                        'poseId': pose_num,
-                        'score': affinity,
-                        'rmsd_lb': rmsd_lb,
-                        'rmsd_ub': rmsd_ub
-                    })
-                except (ValueError, IndexError):
-                    continue
-        
+
         if not poses:
             raise Exception("No poses found in Vina output")
         
@@ -605,67 +1070,362 @@ def run_vina_docking(receptor_pdbqt, ligand_pdbqt, config):
     except Exception as e:
         raise Exception(f"Vina docking failed: {str(e)}")
 
-def run_vina_docking_python(receptor_pdbqt, ligand_pdbqt, config):
+def _run_one_vina(ligand_pdbqt, receptor_pdbqt, config):
+    """Dock a single ligand, mapping failures to an error dict"""
+    try:
+        return run_vina_docking(receptor_pdbqt, ligand_pdbqt, config)
+    except Exception as e:
+        return {'status': 'error', 'message': str(e), 'output_file': None}
+
+def run_vina_batch(receptor_pdbqt, ligand_pdbqts, config, n_workers=None):
     """
-    Run AutoDock Vina docking using Python bindings (fallback)
+    Dock many prepared ligands against one receptor in parallel
+
+    A single Vina process stops scaling after a few cores because its
+    internal search iterations end in a serial tail, so for
+    multi-ligand screening the parallelism belongs at the outer loop:
+    each pool worker runs one Vina with cpu=1 and the pool keeps every
+    core saturated across ligand boundaries. Results are collected as
+    workers finish so one slow ligand does not stall the rest.
+
+    Returns a list aligned with ligand_pdbqts; ligands that fail to
+    dock yield {'status': 'error', ...} entries instead of aborting
+    the batch.
     """
-    from vina import Vina
-    
-    # Initialize Vina
-    v = Vina(sf_name='vina', verbosity=0)
-    
-    # Set receptor
-    v.set_receptor(receptor_pdbqt)
-    
-    # Set ligand
-    v.set_ligand_from_file(ligand_pdbqt)
-    
-    # Set search space
+    if not ligand_pdbqts:
+        return []
+
+    workers = min(len(ligand_pdbqts), n_workers or (os.cpu_count() or 1))
+    if workers <= 1:
+        return [_run_one_vina(lig, receptor_pdbqt, config)
+                for lig in ligand_pdbqts]
+
+    worker_config = {**config, 'cpu': 1}
+    results = [None] * len(ligand_pdbqts)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_run_one_vina, lig, receptor_pdbqt, worker_config): i
+            for i, lig in enumerate(ligand_pdbqts)
+        }
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+
+    print(f"[Vina Batch] Docked {len(results)} ligands with {workers} workers", file=sys.stderr)
+    return results
+
+class VinaSession:
+    """
+    Reusable Python-vina docking session for one receptor
+
+    compute_vina_maps is the expensive part of a Python-bindings dock
+    (grid-map precomputation, seconds for large boxes) and depends only
+    on the receptor and grid, so it runs once here; dock() then reuses
+    the maps for every ligand. For screening one receptor against many
+    ligands that drops the per-ligand cost by the whole grid-prep
+    fraction.
+    """
+
+    def __init__(self, receptor_pdbqt, config):
+        from vina import Vina
+
+        self.config = config
+        self.v = Vina(sf_name='vina', cpu=_DEFAULT_CPU, verbosity=0)
+        self.v.set_receptor(receptor_pdbqt)
+
+        center = config.get('gridCenter', {'x': 0, 'y': 0, 'z': 0})
+        size = config.get('gridSize', {'x': 20, 'y': 20, 'z': 20})
+        self.v.compute_vina_maps(
+            center=[center['x'], center['y'], center['z']],
+            box_size=[size['x'], size['y'], size['z']]
+        )
+
+    def dock(self, ligand_pdbqt, config=None):
+        """Dock one ligand against the precomputed receptor maps"""
+        cfg = config if config is not None else self.config
+        self.v.set_ligand_from_file(ligand_pdbqt)
+
+        exhaustiveness = cfg.get('exhaustivity', 8)
+        n_poses = cfg.get('numPoses', 9)
+        self.v.dock(exhaustiveness=exhaustiveness, n_poses=n_poses)
+
+        # Get results
+        energies = self.v.energies()
+        poses = []
+
+        for i in range(len(energies)):
+            poses.append({
+                'poseId': i + 1,
+                'score': float(energies[i][0]),
+                'rmsd_lb': float(energies[i][1]) if len(energies[i]) > 1 else 0.0,
+                'rmsd_ub': float(energies[i][2]) if len(energies[i]) > 2 else 0.0
+            })
+
+        # Write output poses
+        output_file = ligand_pdbqt.replace('.pdbqt', '_out.pdbqt')
+        self.v.write_poses(output_file, n_poses=n_poses, overwrite=True)
+
+        return {
+            'status': 'success',
+            'poses': poses,
+            'output_file': output_file,
+            'best_affinity': float(energies[0][0]) if energies else None
+        }
+
+# Prepared sessions keyed by receptor file and grid box: the grid maps
+# are identical for every ligand docked into the same receptor/box, so
+# screening runs reuse them instead of recomputing per call. Maps are
+# memory-heavy, hence the small cap with oldest-hit-last eviction.
+_VINA_SESSION_CACHE = {}
+_VINA_SESSION_CACHE_MAX = 4
+
+def _vina_session(receptor_pdbqt, config):
+    """Cached VinaSession for this receptor file + grid box"""
     center = config.get('gridCenter', {'x': 0, 'y': 0, 'z': 0})
     size = config.get('gridSize', {'x': 20, 'y': 20, 'z': 20})
-    
-    v.compute_vina_maps(
-        center=[center['x'], center['y'], center['z']],
-        box_size=[size['x'], size['y'], size['z']]
-    )
-    
-    # Run docking
-    exhaustiveness = config.get('exhaustivity', 8)
-    n_poses = config.get('numPoses', 9)
-    
-    v.dock(exhaustiveness=exhaustiveness, n_poses=n_poses)
-    
-    # Get results
-    energies = v.energies()
-    poses = []
-    
-    for i in range(len(energies)):
-        poses.append({
-            'poseId': i + 1,
-            'score': float(energies[i][0]),
-            'rmsd_lb': float(energies[i][1]) if len(energies[i]) > 1 else 0.0,
-            'rmsd_ub': float(energies[i][2]) if len(energies[i]) > 2 else 0.0
-        })
-    
-    # Write output poses
-    output_file = ligand_pdbqt.replace('.pdbqt', '_out.pdbqt')
-    v.write_poses(output_file, n_poses=n_poses, overwrite=True)
-    
+    key = (os.path.abspath(receptor_pdbqt), os.path.getmtime(receptor_pdbqt),
+           (center['x'], center['y'], center['z']),
+           (size['x'], size['y'], size['z']))
+
+    # pop + reinsert keeps the dict ordered most-recently-used last
+    session = _VINA_SESSION_CACHE.pop(key, None)
+    if session is None:
+        session = VinaSession(receptor_pdbqt, config)
+        if len(_VINA_SESSION_CACHE) >= _VINA_SESSION_CACHE_MAX:
+            _VINA_SESSION_CACHE.pop(next(iter(_VINA_SESSION_CACHE)))
+    _VINA_SESSION_CACHE[key] = session
+    return session
+
+def run_vina_docking_python(receptor_pdbqt, ligand_pdbqt, config):
+    """
+    Run AutoDock Vina docking using Python bindings (fallback)
+
+    Sessions (receptor + precomputed grid maps) are cached per
+    receptor file and grid box, so many-ligand runs against one
+    receptor pay compute_vina_maps once instead of per ligand.
+    """
+    return _vina_session(receptor_pdbqt, config).dock(ligand_pdbqt, config)
+
+def _extract_ca_coords(pdb_text):
+    """
+    (N, 3) float32 array of C-alpha positions from raw PDB text
+
+    Reads the fixed-width ATOM records directly — coordinates live in
+    columns 31-54 — instead of building a structure tree just to pull
+    one atom per residue. One pass over the lines into a preallocated
+    array.
+    """
+
+    ca_lines = [ln for ln in pdb_text.splitlines()
+                if ln.startswith('ATOM') and ln[12:16] == ' CA ']
+    coords = np.empty((len(ca_lines), 3), dtype=np.float32)
+    for i, ln in enumerate(ca_lines):
+        coords[i, 0] = float(ln[30:38])
+        coords[i, 1] = float(ln[38:46])
+        coords[i, 2] = float(ln[46:54])
+    return coords
+
+# Hetero residues that are never the docking target: water, ions,
+# solvents, glycerol, buffers
+_GRID_SKIP_RESIDUES = frozenset({
+    'HOH', 'WAT', 'H2O', 'DOD', 'D2O',  # Water
+    'NA', 'CL', 'K', 'BR', 'I', 'F',     # Ions
+    'MG', 'CA', 'ZN', 'FE', 'MN', 'CU', 'NI', 'CO',  # Metal ions
+    'SO4', 'PO4', 'NO3', 'ACT', 'EDO', 'GOL', 'PEG',  # Buffers/additives
+    'DMS', 'DMSO', 'BME', 'DTT', 'TRS', 'EPE',  # Solvents/reducing agents
+    'PG4', 'P6G', 'PEG', 'P33', 'PE8', 'PE7',  # Polyethylene glycol
+    'SO3', 'SUL', 'FMT', 'AZI', 'IOD', 'CIT'   # Other common additives
+})
+
+# Array form for vectorized np.isin filtering of HETATM residue names
+_GRID_SKIP_ARRAY = np.array(sorted(_GRID_SKIP_RESIDUES))
+
+def _ligand_grid_box(het_res, het_coords):
+    """
+    Grid dict centered on the largest hetero group (likely the inhibitor)
+
+    het_res/het_coords are parallel arrays of residue names and atom
+    positions, already filtered of water/ions/buffers.
+    """
+
+    # Group by residue name: stable sort, then unique gives each
+    # group's start offset and size in the sorted order
+    order = np.argsort(het_res, kind='stable')
+    het_res = het_res[order]
+    het_coords = het_coords[order]
+    group_names, starts, counts = np.unique(
+        het_res, return_index=True, return_counts=True)
+
+    largest = np.argmax(counts)
+    ligand_name = str(group_names[largest])
+    num_groups = len(group_names)
+    ligand_coords = het_coords[starts[largest]:starts[largest] + counts[largest]]
+
+    # Calculate center and bounding box extent in one pass each
+    center = ligand_coords.mean(axis=0)
+    span = np.ptp(ligand_coords, axis=0)
+
+    # Intelligent sizing based on ligand size
+    # Small ligands (< 20 atoms): 22Å box
+    # Medium ligands (20-50 atoms): 25Å box
+    # Large ligands (> 50 atoms): 28Å box
+    num_atoms = len(ligand_coords)
+    if num_atoms < 20:
+        base_size = 22.0
+    elif num_atoms < 50:
+        base_size = 25.0
+    else:
+        base_size = 28.0
+
+    # Larger of base_size or ligand_span + 12Å padding, capped
+    # at 35Å to avoid excessive search space
+    size = np.clip(span + 12.0, base_size, 35.0)
+
+    print(f"[Grid Detection] Found {num_groups} hetero residues, using largest: {ligand_name} ({num_atoms} atoms)", file=sys.stderr)
+    print(f"[Grid Detection] Ligand center: ({center[0]:.2f}, {center[1]:.2f}, {center[2]:.2f})", file=sys.stderr)
+    print(f"[Grid Detection] Grid size: ({size[0]:.2f}, {size[1]:.2f}, {size[2]:.2f}) Å", file=sys.stderr)
+
+    return {
+        'center': {'x': float(center[0]), 'y': float(center[1]), 'z': float(center[2])},
+        'size': {'x': float(size[0]), 'y': float(size[1]), 'z': float(size[2])},
+        'method': f'co-crystallized ligand ({ligand_name}, {num_atoms} atoms)',
+        'confidence': 'high'
+    }
+
+def _ca_grid_box(pdb_content):
+    """Whole-protein grid centered on the CA center of mass, or None"""
+    ca_coords = _receptor_index(pdb_content)['ca_coords']
+    if len(ca_coords) == 0:
+        return None
+
+    center = ca_coords.mean(axis=0)
+
+    print(f"[Grid Detection] No ligand found - using center of mass", file=sys.stderr)
+    print(f"[Grid Detection] Center: ({center[0]:.2f}, {center[1]:.2f}, {center[2]:.2f})", file=sys.stderr)
+    print(f"[Grid Detection] Grid size: 30x30x30 Å (whole protein search)", file=sys.stderr)
+
     return {
-        'status': 'success',
-        'poses': poses,
-        'output_file': output_file,
-        'best_affinity': float(energies[0][0]) if energies else None
+        'center': {'x': float(center[0]), 'y': float(center[1]), 'z': float(center[2])},
+        'size': {'x': 30.0, 'y': 30.0, 'z': 30.0},
+        'method': 'center of mass (whole protein)',
+        'confidence': 'low'
     }
 
+def _detect_binding_site_text(pdb_content):
+    """
+    Binding-site detection straight from the fixed-width PDB records
+
+    HETATM residue names live in columns 18-20 and coordinates in 31-54,
+    so one pass over the lines is enough — no Entity/Residue/Atom object
+    tree gets built at all.
+    """
+
+    # The whole scan is vectorized: one boolean startswith mask picks
+    # the HETATM lines, a character-matrix view slices the fixed
+    # columns out of all of them at once, and a single astype parses
+    # every coordinate - no per-line float() or strip() calls
+    lines = np.array(pdb_content.splitlines())
+    het_lines = lines[np.char.startswith(lines, 'HETATM')] if lines.size else lines
+    width = het_lines.dtype.itemsize // 4 if het_lines.size else 0
+    if width >= 54:
+        chars = het_lines.view('U1').reshape(len(het_lines), width)
+        resnames = np.char.strip(
+            np.ascontiguousarray(chars[:, 17:20]).view('U3').ravel())
+        keep = ~np.isin(resnames, _GRID_SKIP_ARRAY)
+        if keep.any():
+            chars = chars[keep]
+            het_xyz = np.stack([
+                np.ascontiguousarray(chars[:, c:c + 8]).view('U8').ravel()
+                  .astype(np.float32)
+                for c in (30, 38, 46)
+            ], axis=1)
+            return _ligand_grid_box(resnames[keep], het_xyz)
+
+    box = _ca_grid_box(pdb_content)
+    if box is not None:
+        return box
+
+    raise Exception("Could not extract coordinates from PDB")
+
+def _detect_binding_site_gemmi(pdb_content):
+    """
+    Structure-based detection via gemmi's C++ PDB parser
+
+    gemmi parses the same text an order of magnitude faster than
+    Bio.PDB and keeps atoms in C++ vectors instead of one Python
+    object each, so it is the preferred structural fallback when the
+    fixed-width text scan cannot make sense of the columns. Raises
+    ImportError when gemmi is not installed.
+    """
+    import gemmi
+
+    structure = gemmi.read_pdb_string(pdb_content)
+    het_res = []
+    het_xyz = []
+    for model in structure:
+        for chain in model:
+            for residue in chain:
+                if residue.het_flag == 'H' and residue.name not in _GRID_SKIP_RESIDUES:
+                    for atom in residue:
+                        het_res.append(residue.name)
+                        het_xyz.append((atom.pos.x, atom.pos.y, atom.pos.z))
+        break  # first model only, matching the other detectors
+
+    if het_res:
+        return _ligand_grid_box(np.array(het_res),
+                                np.array(het_xyz, dtype=np.float32))
+
+    box = _ca_grid_box(pdb_content)
+    if box is not None:
+        return box
+
+    raise Exception("Could not extract coordinates from PDB")
+
+def _detect_binding_site_biopython(pdb_content):
+    """
+    Structure-based detection, kept as a fallback for PDBs whose
+    fixed-width columns the text scanner cannot make sense of
+    """
+    from Bio.PDB import PDBParser
+
+    parser = PDBParser(QUIET=True)
+    structure = parser.get_structure('protein', StringIO(pdb_content))
+
+    # Gather every atom once into parallel arrays; the rest of the
+    # detection is vectorized masks and group-bys instead of four
+    # nested Python loops with per-atom attribute access
+    atoms = list(structure.get_atoms())
+    n_atoms = len(atoms)
+    if n_atoms == 0:
+        raise Exception("Could not extract coordinates from PDB")
+
+    coords = np.fromiter(
+        (c for a in atoms for c in a.coord),
+        dtype=np.float32, count=3 * n_atoms
+    ).reshape(-1, 3)
+    residues = [a.get_parent() for a in atoms]
+    resnames = np.array([r.resname.strip() for r in residues])
+    hetfields = np.array([r.id[0] for r in residues])
+
+    het_mask = np.char.startswith(hetfields, 'H_') & ~np.isin(
+        resnames, list(_GRID_SKIP_RESIDUES))
+
+    if het_mask.any():
+        return _ligand_grid_box(resnames[het_mask], coords[het_mask])
+
+    box = _ca_grid_box(pdb_content)
+    if box is not None:
+        return box
+
+    raise Exception("Could not extract coordinates from PDB")
+
 def detect_binding_site(pdb_content):
     """
     Automatically detect binding site from PDB structure
-    
+
     Priority order:
     1. Co-crystallized ligand (HETATM records)
     2. Center of mass (fallback)
-    
+
     Returns:
         dict: {
             'center': {'x': float, 'y': float, 'z': float},
@@ -674,112 +1434,25 @@ def detect_binding_site(pdb_content):
             'confidence': str
         }
     """
+    # Fast path: read the records directly from the text. Biopython's
+    # full structure parse only runs if that fails (malformed columns,
+    # odd numbering), so the usual case allocates no structure objects
     try:
-        from Bio.PDB import PDBParser
-        from io import StringIO
-        import numpy as np
-        
-        # Parse PDB structure
-        parser = PDBParser(QUIET=True)
-        structure = parser.get_structure('protein', StringIO(pdb_content))
-        
-        # Method 1: Look for co-crystallized ligand (HETATM)
-        # Skip: water, ions, solvents, glycerol, buffers
-        skip_residues = {
-            'HOH', 'WAT', 'H2O', 'DOD', 'D2O',  # Water
-            'NA', 'CL', 'K', 'BR', 'I', 'F',     # Ions
-            'MG', 'CA', 'ZN', 'FE', 'MN', 'CU', 'NI', 'CO',  # Metal ions
-            'SO4', 'PO4', 'NO3', 'ACT', 'EDO', 'GOL', 'PEG',  # Buffers/additives
-            'DMS', 'DMSO', 'BME', 'DTT', 'TRS', 'EPE',  # Solvents/reducing agents
-            'PG4', 'P6G', 'PEG', 'P33', 'PE8', 'PE7',  # Polyethylene glycol
-            'SO3', 'SUL', 'FMT', 'AZI', 'IOD', 'CIT'   # Other common additives
-        }
-        
-        # Collect all hetero residues with their atoms
-        hetero_groups = {}
-        
-        for model in structure:
-            for chain in model:
-                for residue in chain:
-                    if residue.id[0].startswith('H_'):
-                        resname = residue.resname.strip()
-                        if resname not in skip_residues:
-                            if resname not in hetero_groups:
-                                hetero_groups[resname] = []
-                            for atom in residue:
-                                hetero_groups[resname].append(atom.coord)
-        
-        # Find the largest ligand (most likely the inhibitor, not cofactor)
-        if hetero_groups:
-            largest_ligand = max(hetero_groups.items(), key=lambda x: len(x[1]))
-            ligand_name = largest_ligand[0]
-            ligand_coords = np.array(largest_ligand[1])
-            
-            # Calculate center and bounding box
-            center = np.mean(ligand_coords, axis=0)
-            min_coords = np.min(ligand_coords, axis=0)
-            max_coords = np.max(ligand_coords, axis=0)
-            span = max_coords - min_coords
-            
-            # Intelligent sizing based on ligand size
-            # Small ligands (< 20 atoms): 22Å box
-            # Medium ligands (20-50 atoms): 25Å box
-            # Large ligands (> 50 atoms): 28Å box
-            num_atoms = len(ligand_coords)
-            if num_atoms < 20:
-                base_size = 22.0
-            elif num_atoms < 50:
-                base_size = 25.0
-            else:
-                base_size = 28.0
-            
-            # Use larger of: base_size or ligand_span + 12Å padding
-            size = np.maximum(span + 12.0, base_size)
-            
-            # Cap at 35Å to avoid excessive search space
-            size = np.minimum(size, 35.0)
-            
-            print(f"[Grid Detection] Found {len(hetero_groups)} hetero residues, using largest: {ligand_name} ({num_atoms} atoms)", file=sys.stderr)
-            print(f"[Grid Detection] Ligand center: ({center[0]:.2f}, {center[1]:.2f}, {center[2]:.2f})", file=sys.stderr)
-            print(f"[Grid Detection] Grid size: ({size[0]:.2f}, {size[1]:.2f}, {size[2]:.2f}) Å", file=sys.stderr)
-            
-            return {
-                'center': {'x': float(center[0]), 'y': float(center[1]), 'z': float(center[2])},
-                'size': {'x': float(size[0]), 'y': float(size[1]), 'z': float(size[2])},
-                'method': f'co-crystallized ligand ({ligand_name}, {num_atoms} atoms)',
-                'confidence': 'high'
-            }
-        
-        # Method 2: Center of mass (fallback)
-        protein_coords = []
-        for model in structure:
-            for chain in model:
-                for residue in chain:
-                    if residue.id[0] == ' ':  # Standard amino acids only
-                        for atom in residue:
-                            if atom.name == 'CA':  # C-alpha atoms only
-                                protein_coords.append(atom.coord)
-        
-        if len(protein_coords) > 0:
-            coords_array = np.array(protein_coords)
-            center = np.mean(coords_array, axis=0)
-            
-            # Use generous grid size (30Å cube) for whole protein search
-            size = np.array([30.0, 30.0, 30.0])
-            
-            print(f"[Grid Detection] No ligand found - using center of mass", file=sys.stderr)
-            print(f"[Grid Detection] Center: ({center[0]:.2f}, {center[1]:.2f}, {center[2]:.2f})", file=sys.stderr)
-            print(f"[Grid Detection] Grid size: 30x30x30 Å (whole protein search)", file=sys.stderr)
-            
-            return {
-                'center': {'x': float(center[0]), 'y': float(center[1]), 'z': float(center[2])},
-                'size': {'x': 30.0, 'y': 30.0, 'z': 30.0},
-                'method': 'center of mass (whole protein)',
-                'confidence': 'low'
-            }
-        
-        raise Exception("Could not extract coordinates from PDB")
-        
+        return _detect_binding_site_text(pdb_content)
+    except Exception as e:
+        print(f"[Grid Detection] Text scan failed ({e}), retrying with structure parser", file=sys.stderr)
+
+    # Structural fallbacks in speed order: gemmi (C++ parse, no Python
+    # object per atom) when installed, then Biopython
+    try:
+        return _detect_binding_site_gemmi(pdb_content)
+    except ImportError:
+        pass
+    except Exception as e:
+        print(f"[Grid Detection] gemmi parse failed ({e}), retrying with Biopython", file=sys.stderr)
+
+    try:
+        return _detect_binding_site_biopython(pdb_content)
     except Exception as e:
         print(f"[Grid Detection Error] {str(e)}", file=sys.stderr)
         # Ultimate fallback
@@ -796,144 +1469,197 @@ def split_vina_poses(output_pdbqt, work_dir):
     
     Vina outputs all poses in one file. This function separates them.
     """
-    import os
-    
     try:
         if not os.path.exists(output_pdbqt):
             raise FileNotFoundError(f"Output file not found: {output_pdbqt}")
-        
-        # Read the output file
-        with open(output_pdbqt, 'r') as f:
-            content = f.read()
-        
-        # Split by MODEL records
-        poses = []
-        current_pose = []
-        pose_num = 0
-        
-        for line in content.split('\n'):
-            if line.startswith('MODEL'):
-                pose_num += 1
-                current_pose = [line + '\n']
-            elif line.startswith('ENDMDL'):
-                current_pose.append(line + '\n')
-                poses.append(''.join(current_pose))
-                current_pose = []
-            elif current_pose:
-                current_pose.append(line + '\n')
-        
-        # Write individual pose files
-        pose_files = []
-        for i, pose_content in enumerate(poses, 1):
+
+        # Each pose is one MODEL...ENDMDL block: map the file read-only
+        # and run the regex straight over the mapped pages. Peak memory
+        # stays around the matched poses instead of the whole file plus
+        # its split copies
+        blocks = []
+        with open(output_pdbqt, 'rb') as f:
+            if os.fstat(f.fileno()).st_size > 0:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    blocks = [m.group(0) for m in _POSE_BLOCK_RE.finditer(mm)]
+
+        def _dump(i, block):
             pose_file = os.path.join(work_dir, f'pose_{i}.pdbqt')
-            with open(pose_file, 'w') as f:
-                f.write(pose_content)
-            pose_files.append(pose_file)
-            print(f"[Pose Separation] Created pose file: pose_{i}.pdbqt", file=sys.stderr)
-        
-        print(f"[Pose Separation] Successfully split {len(poses)} poses", file=sys.stderr)
+            with open(pose_file, 'wb') as out:
+                out.write(block)
+            return pose_file
+
+        # The writes are independent and write() releases the GIL, so a
+        # small thread pool overlaps them; one pose skips the pool
+        if len(blocks) > 1:
+            with ThreadPoolExecutor(max_workers=min(4, len(blocks))) as executor:
+                pose_files = list(executor.map(
+                    _dump, range(1, len(blocks) + 1), blocks))
+        else:
+            pose_files = [_dump(1, block) for block in blocks]
+
+        print(f"[Pose Separation] Successfully split {len(pose_files)} poses", file=sys.stderr)
         return pose_files
         
     except Exception as e:
         print(f"[Pose Separation Error] {str(e)}", file=sys.stderr)
         return []
 
+def _truncate_pdbqt_uniform(data):
+    """
+    Vectorized column truncation for uniform coordinate-only buffers
+
+    When every line is an equal-width ATOM/HETATM record the whole file
+    can be viewed as a 2-D byte matrix and the charge/type columns cut
+    off with one slice + memcpy. Returns None when the layout does not
+    qualify (mixed records or ragged widths) so the caller falls back
+    to the per-line path.
+    """
+
+    nl = data.find(b'\n')
+    width = nl + 1
+    if nl < 66 or len(data) % width:
+        return None
+
+    view = np.frombuffer(data, dtype='S1').reshape(-1, width)
+    if not (view[:, -1] == b'\n').all():
+        return None
+    rows = np.frombuffer(data, dtype=f'S{width}')
+    if not (np.char.startswith(rows, b'ATOM') | np.char.startswith(rows, b'HETATM')).all():
+        return None
+
+    out = np.empty((view.shape[0], 67), dtype='S1')
+    out[:, :66] = view[:, :66]
+    out[:, 66] = b'\n'
+    return out.tobytes()
+
 def pdbqt_to_pdb(pdbqt_file, pdb_file):
     """
     Convert PDBQT file to PDB format
-    
+
     Simple conversion: remove charge and atom type columns
     """
     try:
-        with open(pdbqt_file, 'r') as f:
-            lines = f.readlines()
-        
-        pdb_lines = []
-        for line in lines:
-            if line.startswith(('ATOM', 'HETATM')):
-                # PDBQT format has charge and atom type in last columns
-                # PDB format doesn't need them
-                pdb_line = line[:66] + '\n'  # Truncate extra columns
-                pdb_lines.append(pdb_line)
-            elif line.startswith(('MODEL', 'ENDMDL', 'TER', 'END')):
-                pdb_lines.append(line)
-        
-        with open(pdb_file, 'w') as f:
-            f.writelines(pdb_lines)
+        with open(pdbqt_file, 'rb') as f:
+            data = f.read()
+
+        # PDBQT is PDB plus charge/type columns: truncate coordinate
+        # records at column 66, keep structural records as-is, drop the
+        # rest, and emit everything in one write. Coordinate-only files
+        # with uniform line widths take the byte-matrix shortcut
+        pdb_bytes = _truncate_pdbqt_uniform(data)
+        if pdb_bytes is None:
+            pdb_bytes = b''.join(
+                line[:66].rstrip(b'\n') + b'\n' if line.startswith(_COORD_PREFIX)
+                else line
+                for line in data.splitlines(keepends=True)
+                if line.startswith(_PDB_KEEP_PREFIX)
+            )
+
+        with open(pdb_file, 'wb') as f:
+            f.write(pdb_bytes)
         
-        print(f"[PDBQT→PDB] Converted: {pdbqt_file} → {pdb_file}", file=sys.stderr)
+        if _VERBOSE:
+            print(f"[PDBQT→PDB] Converted: {pdbqt_file} → {pdb_file}", file=sys.stderr)
         return True
         
     except Exception as e:
         print(f"[PDBQT→PDB Error] {str(e)}", file=sys.stderr)
         return False
 
-def create_complex(receptor_pdb, ligand_pdb, complex_pdb):
+def create_complex(receptor_pdb, ligand_pdb, complex_pdb, receptor_content=None):
     """
     Create protein-ligand complex by merging PDB files
-    
+
     Args:
-        receptor_pdb: Path to receptor PDB file
+        receptor_pdb: Path to receptor PDB file; may be None when
+            receptor_content is supplied
         ligand_pdb: Path to ligand PDB file (single pose)
         complex_pdb: Path to output complex PDB file
+        receptor_content: Optional pre-stripped receptor text (END
+            records already removed, e.g. from _receptor_index) written
+            as-is instead of re-reading receptor_pdb from disk
+
+    Returns:
+        The assembled complex text (truthy) on success so callers can
+        reuse it without re-reading the file, False on failure
     """
     try:
-        # Read receptor
-        with open(receptor_pdb, 'r') as f:
-            receptor_lines = f.readlines()
-        
-        # Read ligand
-        with open(ligand_pdb, 'r') as f:
-            ligand_lines = f.readlines()
-        
-        # Combine: receptor + TER + ligand
-        complex_lines = []
-        
-        # Add receptor (skip END records)
-        for line in receptor_lines:
-            if not line.startswith('END'):
-                complex_lines.append(line)
-        
-        # Add separator
-        complex_lines.append('TER\n')
-        
-        # Add ligand (skip MODEL/ENDMDL if present)
-        for line in ligand_lines:
-            if not line.startswith(('MODEL', 'ENDMDL', 'END')):
-                complex_lines.append(line)
-        
-        # Add final END
-        complex_lines.append('END\n')
-        
-        # Write complex
-        with open(complex_pdb, 'w') as f:
-            f.writelines(complex_lines)
-        
-        print(f"[Complex] Created: {complex_pdb}", file=sys.stderr)
-        return True
+        # Work on whole byte buffers instead of per-line Python loops:
+        # END records are stripped from the receptor and MODEL/ENDMDL/
+        # END from the ligand with one regex pass each (C-level scans),
+        # then the four pieces are written back to back
+        if receptor_content is not None:
+            rec = receptor_content.encode('ascii', errors='replace')
+        else:
+            with open(receptor_pdb, 'rb') as f:
+                rec = _END_LINE_RE.sub(b'', f.read())
+
+        with open(ligand_pdb, 'rb') as f:
+            lig = _POSE_SKIP_RE.sub(b'', f.read())
+
+        content = b''.join((rec, b'TER\n', lig, b'END\n'))
+        with open(complex_pdb, 'wb') as out:
+            out.write(content)
         
+        if _VERBOSE:
+            print(f"[Complex] Created: {complex_pdb}", file=sys.stderr)
+        return content.decode('ascii', errors='replace')
+
     except Exception as e:
         print(f"[Complex Error] {str(e)}", file=sys.stderr)
         return False
 
+# Interaction results keyed by complex content hash: re-docks of the
+# same ligand/receptor pair (different seeds, re-runs) produce identical
+# complexes, and the O(atoms²) interaction scan dominates post-docking
+_INTERACTION_CACHE_DIR = Path(tempfile.gettempdir()) / 'proteindock_interaction_cache'
+_INTERACTION_CACHE_TTL = 86400  # seconds
+
 def parse_interactions(complex_pdb_path):
     """
     Analyze protein-ligand interactions using custom interaction analyzer
-    
+
+    Results are cached on disk by complex content hash (the complex is
+    exactly receptor + pose, so identical pairs hit the cache) with a
+    one-day expiry.
+
     Args:
         complex_pdb_path: Path to complex PDB file
-    
+
     Returns:
         Dictionary with interaction details
     """
     try:
-        # Import interaction analyzer
-        from interaction_analysis import analyze_complex
-        
+
+        with open(complex_pdb_path, 'rb') as f:
+            key = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+        cached = _INTERACTION_CACHE_DIR / f'{key}.json'
+
+        try:
+            if time.time() - cached.stat().st_mtime < _INTERACTION_CACHE_TTL:
+                with open(cached, 'r') as f:
+                    return json.load(f)
+        except (OSError, ValueError):
+            pass  # no cache entry, expired, or unreadable - analyze
+
+        if _analyze_complex is None:
+            raise Exception("interaction_analysis module not available")
+
         # Analyze interactions
-        interactions = analyze_complex(complex_pdb_path)
+        interactions = _analyze_complex(complex_pdb_path)
+
+        # Cache successful analyses only
+        if 'error' not in interactions.get('summary', {}):
+            try:
+                _INTERACTION_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                with open(cached, 'w') as f:
+                    json.dump(interactions, f)
+            except OSError:
+                pass  # cache dir not writable - analyze again next call
+
         return interactions
-        
+
     except Exception as e:
         print(f"[Interaction Analysis Error] {str(e)}", file=sys.stderr)
         return {
@@ -944,27 +1670,74 @@ def parse_interactions(complex_pdb_path):
             'summary': {'error': str(e)}
         }
 
-def generate_visualizations(complex_pdb_path, output_dir):
+def _process_pose(pose_pdbqt, receptor_pdb):
+    """Convert one pose to PDB, build its complex, scan interactions"""
+    pose_pdb = pose_pdbqt.replace('.pdbqt', '.pdb')
+    pdbqt_to_pdb(pose_pdbqt, pose_pdb)
+
+    complex_pdb = pose_pdbqt.replace('.pdbqt', '_complex.pdb')
+    create_complex(receptor_pdb, pose_pdb, complex_pdb)
+
+    return {
+        'pose_pdbqt': pose_pdbqt,
+        'pose_pdb': pose_pdb,
+        'complex_pdb': complex_pdb,
+        'interactions': parse_interactions(complex_pdb)
+    }
+
+def process_poses(pose_files, receptor_pdb, n_workers=None):
+    """
+    Post-process every docked pose in parallel
+
+    main() only touches the best pose, but callers that want the full
+    top-N analyzed face an embarrassingly parallel job: each pose's
+    PDB conversion, complex assembly and O(atoms²) interaction scan is
+    independent of the others. Fan the poses out over a process pool so
+    the phase costs roughly one pose-time instead of N.
+
+    Returns one dict per pose, in pose order, with pose_pdbqt, pose_pdb,
+    complex_pdb and interactions keys.
+    """
+    if not pose_files:
+        return []
+
+    workers = min(len(pose_files), n_workers or (os.cpu_count() or 1))
+    if workers <= 1:
+        results = [_process_pose(p, receptor_pdb) for p in pose_files]
+    else:
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_process_pose, p, receptor_pdb)
+                       for p in pose_files]
+            results = [f.result() for f in futures]
+
+    print(f"[Pose Processing] Post-processed {len(results)} poses", file=sys.stderr)
+    return results
+
+def generate_visualizations(complex_pdb_path, output_dir, pdb_content=None):
     """
     Generate interactive HTML visualization for protein-ligand complex
-    
+
     Args:
         complex_pdb_path: Path to complex PDB file
         output_dir: Directory to save visualization HTML
-    
+        pdb_content: Optional preloaded complex text (e.g. the return
+            value of create_complex) so the viewer skips its disk read
+
     Returns:
         Dictionary with viewer information
     """
     try:
-        # Import visualization module
-        from visualization import generate_interactive_viewer
-        
+        if _generate_interactive_viewer is None:
+            raise Exception("visualization module not available")
+
         # Generate interactive HTML viewer (auto-expires in 30 minutes)
-        viewer_info = generate_interactive_viewer(
-            complex_pdb_path, 
+        viewer_info = _generate_interactive_viewer(
+            complex_pdb_path,
             output_dir,
             view_type='publication',
-            expire_minutes=30
+            expire_minutes=30,
+            pdb_content=pdb_content
         )
         
         return viewer_info
@@ -973,20 +1746,45 @@ def generate_visualizations(complex_pdb_path, output_dir):
         print(f"[Visualization Error] {str(e)}", file=sys.stderr)
         return {}
 
+def _write_json_out(json_out, result):
+    """Write the final result JSON to the caller-specified file"""
+    try:
+        if orjson is not None:
+            with open(json_out, 'wb') as f:
+                f.write(orjson.dumps(result, option=_ORJSON_OPTS))
+        else:
+            with open(json_out, 'w') as f:
+                json.dump(result, f)
+    except OSError as e:
+        print(f"[Warning] Could not write json_out {json_out}: {e}", file=sys.stderr)
+
+
 def main():
     """
     Main entry point for Vina docking
     Expected input (via stdin): JSON with smiles, pdb_content, and config
     OR {"check_only": true} to just check if Vina is available
+
+    An optional receptor_pdbqt key names an already-prepared receptor
+    PDBQT (e.g. cached from an earlier run); when the file exists the
+    MGLTools/BioPython receptor prep is skipped. pdb_content is still
+    required for binding-site detection and complex assembly.
     """
+    json_out = None
     try:
-        # Read input from stdin
-        input_data = json.loads(sys.stdin.read())
-        
+        # Read input from stdin as raw bytes: orjson parses them
+        # directly, skipping the text-mode decode copy for large
+        # pdb_content payloads
+        input_data = _loads(sys.stdin.buffer.read())
+
+        # Optional path for the final result JSON: callers read one
+        # known-JSON file instead of fishing it out of mixed stdout
+        json_out = input_data.get('json_out')
+
         # Handle check_only mode
         if input_data.get('check_only'):
             if setup_vina_environment():
-                print(json.dumps({'status': 'success', 'available': True}), flush=True)
+                _emit({'status': 'success', 'available': True})
                 sys.exit(0)
             else:
                 sys.exit(1)
@@ -995,6 +1793,17 @@ def main():
         if not setup_vina_environment():
             sys.exit(1)
         
+        # Collector strategy: the scattered per-stage gc.collect() calls
+        # each swept every live RDKit/Biopython object. Instead, disable
+        # the cyclic collector and freeze the long-lived import state out
+        # of its generations; refcounting frees the transient parse data,
+        # and a single sweep runs right before the Vina launch. Set
+        # PDOCK_GC=1 to restore the old per-stage collections.
+        gc_per_stage = os.environ.get('PDOCK_GC') == '1'
+        if not gc_per_stage:
+            gc.disable()
+            gc.freeze()
+
         smiles = input_data.get('smiles')
         pdb_content = input_data.get('pdb_content')
         config = input_data.get('config', {})
@@ -1002,128 +1811,202 @@ def main():
         auto_grid = input_data.get('auto_grid', True)  # Enable auto-detection by default
         
         # Create working directory
-        Path(work_dir).mkdir(parents=True, exist_ok=True)
+        os.makedirs(work_dir, exist_ok=True)
         
         # File paths
         ligand_pdbqt = os.path.join(work_dir, 'ligand.pdbqt')
-        receptor_pdbqt = os.path.join(work_dir, 'receptor.pdbqt')
-        receptor_pdb = os.path.join(work_dir, 'receptor.pdb')
-        
+
         # Convert SMILES to PDBQT
-        print(json.dumps({'progress': 15, 'message': 'Preparing ligand...'}), flush=True)
+        _emit({'progress': 15, 'message': 'Preparing ligand...'})
         smiles_to_pdbqt(smiles, ligand_pdbqt)
-        
-        # Force garbage collection after ligand prep
-        import gc
-        gc.collect()
-        
-        # Save receptor PDB for later use
-        with open(receptor_pdb, 'w') as f:
-            f.write(pdb_content)
-        
+
+        if gc_per_stage:
+            gc.collect()
+
+
         # Auto-detect binding site if requested
         if auto_grid:
-            print(json.dumps({'progress': 25, 'message': 'Detecting binding site...'}), flush=True)
+            _emit({'progress': 25, 'message': 'Detecting binding site...'})
             grid_info = detect_binding_site(pdb_content)
             
             # Override config with detected values
             config['gridCenter'] = grid_info['center']
             config['gridSize'] = grid_info['size']
             
-            print(json.dumps({
-                'progress': 30, 
+            _emit({
+                'progress': 30,
                 'message': f'Grid detected using {grid_info["method"]}',
                 'grid_info': grid_info
-            }), flush=True)
-            
-            # Cleanup
-            gc.collect()
-        
-        # Convert PDB to PDBQT
-        print(json.dumps({'progress': 40, 'message': 'Preparing receptor...'}), flush=True)
-        pdb_to_pdbqt(pdb_content, receptor_pdbqt)
-        
-        # Force garbage collection after receptor prep (biggest memory use)
+            })
+
+            if gc_per_stage:
+                gc.collect()
+
+
+        # Convert PDB to PDBQT, unless the caller supplied an already
+        # prepared receptor - then the whole prep stage is skipped
+        receptor_pdbqt = input_data.get('receptor_pdbqt')
+        if receptor_pdbqt and os.path.exists(receptor_pdbqt):
+            _emit({'progress': 40, 'message': 'Using prepared receptor...'})
+        else:
+            receptor_pdbqt = os.path.join(work_dir, 'receptor.pdbqt')
+            _emit({'progress': 40, 'message': 'Preparing receptor...'})
+            pdb_to_pdbqt(pdb_content, receptor_pdbqt)
+
+        # One full sweep before the long docking run reclaims any prep
+        # cycles while the process sits waiting on Vina, then the
+        # collector comes back on for the post-processing stages
         gc.collect()
-        
+        if not gc_per_stage:
+            gc.enable()
+
         # Run docking
-        print(json.dumps({'progress': 50, 'message': 'Running Vina docking...'}), flush=True)
+        _emit({'progress': 50, 'message': 'Running Vina docking...'})
         result = run_vina_docking(receptor_pdbqt, ligand_pdbqt, config)
-        
-        # Cleanup after docking
-        gc.collect()
-        
+
+
         # Split poses into individual files
-        print(json.dumps({'progress': 85, 'message': 'Separating poses...'}), flush=True)
+        _emit({'progress': 85, 'message': 'Separating poses...'})
         pose_files = split_vina_poses(result['output_file'], work_dir)
         
         # Convert best pose to PDB and create complex
         if pose_files and len(pose_files) > 0:
-            print(json.dumps({'progress': 90, 'message': 'Creating complex...'}), flush=True)
+            _emit({'progress': 90, 'message': 'Creating complex...'})
             
             # Convert best pose PDBQT → PDB
             best_pose_pdbqt = pose_files[0]  # Poses are already sorted by score
             best_pose_pdb = best_pose_pdbqt.replace('.pdbqt', '.pdb')
             pdbqt_to_pdb(best_pose_pdbqt, best_pose_pdb)
             
-            # Create complex
+            # Create complex straight from the in-memory receptor text:
+            # nothing downstream reads a receptor.pdb from disk, so the
+            # write-and-read-back round-trip is skipped entirely. Keep
+            # the assembled content for the viewer stage
             complex_pdb = os.path.join(work_dir, 'complex.pdb')
-            create_complex(receptor_pdb, best_pose_pdb, complex_pdb)
+            complex_content = create_complex(
+                None, best_pose_pdb, complex_pdb,
+                receptor_content=_receptor_index(pdb_content)['body'])
             
             # Add to results
             result['best_pose_pdb'] = best_pose_pdb
             result['complex_pdb'] = complex_pdb
             result['pose_files'] = pose_files
         
-        # Analyze interactions (skip if low memory)
-        print(json.dumps({'progress': 93, 'message': 'Analyzing interactions...'}), flush=True)
-        if 'complex_pdb' in result:
-            try:
-                interactions = parse_interactions(result['complex_pdb'])
-                result['interactions'] = interactions
-                
-                # Add interaction summary to best pose
-                if len(result['poses']) > 0:
-                    result['poses'][0]['interactions'] = interactions
-            except Exception as e:
-                print(f"[Interaction Analysis] Skipped due to error: {str(e)}", file=sys.stderr)
-                result['interactions'] = {'error': 'Analysis skipped to save memory'}
-        
-        # Cleanup before visualization
-        gc.collect()
-        
-        # Generate visualizations (skip if low memory)
-        print(json.dumps({'progress': 96, 'message': 'Generating viewer...'}), flush=True)
+        # Analyze interactions and generate the viewer concurrently:
+        # both depend only on the complex, so the viewer's compress-and-
+        # write I/O runs in a worker thread while the main thread does
+        # the geometric analysis. The analysis stays on the main thread
+        # because its parallel numba kernel must not first run off it
+        _emit({'progress': 93, 'message': 'Analyzing interactions...'})
         if 'complex_pdb' in result:
-            try:
-                viewer_info = generate_visualizations(result['complex_pdb'], work_dir)
-                result['viewer'] = viewer_info
-            except Exception as e:
-                print(f"[Visualization] Skipped due to error: {str(e)}", file=sys.stderr)
-                result['viewer'] = {'error': 'Visualization skipped to save memory'}
-        
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                future_viz = pool.submit(
+                    generate_visualizations,
+                    result['complex_pdb'], work_dir,
+                    pdb_content=complex_content if isinstance(complex_content, str) else None)
+
+                try:
+                    interactions = parse_interactions(result['complex_pdb'])
+                    result['interactions'] = interactions
+
+                    # Add interaction summary to best pose
+                    if len(result['poses']) > 0:
+                        result['poses'][0]['interactions'] = interactions
+                except Exception as e:
+                    print(f"[Interaction Analysis] Skipped due to error: {str(e)}", file=sys.stderr)
+                    result['interactions'] = {'error': 'Analysis skipped to save memory'}
+
+                _emit({'progress': 96, 'message': 'Generating viewer...'})
+                try:
+                    result['viewer'] = future_viz.result()
+                except Exception as e:
+                    print(f"[Visualization] Skipped due to error: {str(e)}", file=sys.stderr)
+                    result['viewer'] = {'error': 'Visualization skipped to save memory'}
+
+        if gc_per_stage:
+            gc.collect()
+
+
         # Add grid information to results
         if auto_grid:
             result['grid_detection'] = grid_info
         
-        # Final cleanup
-        gc.collect()
-        
+        if gc_per_stage:
+            gc.collect()
+
         # Return results
         result['progress'] = 100
         result['message'] = 'Docking completed successfully'
-        print(json.dumps(result), flush=True)
-        
+        if json_out:
+            _write_json_out(json_out, result)
+        _emit(result)
+
     except Exception as e:
-        import traceback
         error_result = {
             'status': 'error',
             'message': str(e),
             'traceback': traceback.format_exc()
         }
-        print(json.dumps(error_result), flush=True)
+        if json_out:
+            _write_json_out(json_out, error_result)
+        _emit(error_result)
         print(f"[Error Details] {traceback.format_exc()}", file=sys.stderr)
         sys.exit(1)
 
+def run_daemon():
+    """
+    Serve docking requests over stdin, one JSON object per line
+
+    A shell screener that forks this CLI per ligand pays the RDKit and
+    Meeko import cost (~1 s) on every fork, which dominates wall time
+    for small ligands. Daemon mode keeps one process alive instead:
+    each stdin line is a JSON request, each response one JSON line on
+    stdout, and the module's warm caches (prepared ligands, receptor
+    PDBQT, Vina sessions) persist across requests.
+
+    Supported requests:
+      {"op": "ping"}
+      {"op": "smiles_to_pdbqt", "smiles": ..., "output_file": ...}
+      {"op": "pdb_to_pdbqt", "pdb_content": ..., "output_file": ...}
+      {"op": "detect_binding_site", "pdb_content": ...}
+      {"op": "dock", "receptor_pdbqt": ..., "ligand_pdbqt": ...,
+       "config": {...}}
+
+    A blank line or EOF ends the loop; per-request failures come back
+    as error responses rather than killing the daemon.
+    """
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            break
+        try:
+            request = _loads(line)
+            op = request.get('op')
+            if op == 'ping':
+                response = {'status': 'success', 'op': op}
+            elif op == 'smiles_to_pdbqt':
+                smiles_to_pdbqt(request['smiles'], request['output_file'])
+                response = {'status': 'success', 'op': op,
+                            'output_file': request['output_file']}
+            elif op == 'pdb_to_pdbqt':
+                pdb_to_pdbqt(request['pdb_content'], request['output_file'])
+                response = {'status': 'success', 'op': op,
+                            'output_file': request['output_file']}
+            elif op == 'detect_binding_site':
+                response = {'status': 'success', 'op': op,
+                            'grid': detect_binding_site(request['pdb_content'])}
+            elif op == 'dock':
+                response = run_vina_docking(
+                    request['receptor_pdbqt'], request['ligand_pdbqt'],
+                    request.get('config', {}))
+            else:
+                response = {'status': 'error', 'message': f'Unknown op: {op}'}
+        except Exception as e:
+            response = {'status': 'error', 'message': str(e)}
+        _emit(response)
+
 if __name__ == '__main__':
-    main()
+    if '--daemon' in sys.argv[1:]:
+        run_daemon()
+    else:
+        main()
@@ -7,111 +7,29 @@ Auto-cleanup after viewing session
 
 import sys
 import os
+import re
 import json
 from pathlib import Path
+from types import MappingProxyType
 from typing import Dict, Optional
 import uuid
 import time
+import gzip
+import heapq
+import base64
+import threading
 from datetime import datetime, timedelta
 
 
-class InteractiveMolecularViewer:
-    """
-    Generate interactive 3D molecular visualizations using py3Dmol
-    Creates temporary HTML files that auto-expire
-    """
-    
-    # Store active viewers with expiration times
-    _active_viewers = {}
-    
-    def __init__(self, complex_pdb_path: str):
-        """
-        Initialize viewer with complex PDB file
-        
-        Args:
-            complex_pdb_path: Path to PDB file containing protein and ligand
-        """
-        self.complex_pdb = complex_pdb_path
-        
-        # Read PDB content
-        with open(complex_pdb_path, 'r') as f:
-            self.pdb_content = f.read()
-        
-        print(f"[Interactive Viewer] Loaded complex: {complex_pdb_path}", file=sys.stderr)
-    
-    def generate_interactive_html(self, 
-                                  output_html: str,
-                                  view_type: str = 'publication',
-                                  width: int = 800,
-                                  height: int = 600,
-                                  expire_minutes: int = 30) -> Dict[str, str]:
-        """
-        Generate interactive HTML viewer using py3Dmol
-        
-        Args:
-            output_html: Path to save HTML file
-            view_type: Type of view ('publication', 'binding_site', 'surface', 'all')
-            width: Viewer width in pixels
-            height: Viewer height in pixels
-            expire_minutes: Minutes before file auto-expires
-        
-        Returns:
-            Dictionary with file path and viewer ID
-        """
-        try:
-            viewer_id = str(uuid.uuid4())
-            
-            # Generate HTML with embedded py3Dmol viewer
-            html_content = self._generate_html_content(view_type, width, height, viewer_id)
-            
-            # Write HTML file
-            with open(output_html, 'w', encoding='utf-8') as f:
-                f.write(html_content)
-            
-            # Register for auto-cleanup
-            expiration = datetime.now() + timedelta(minutes=expire_minutes)
-            self._active_viewers[viewer_id] = {
-                'file_path': output_html,
-                'expiration': expiration,
-                'created': datetime.now()
-            }
-            
-            print(f"[Interactive Viewer] Created viewer: {output_html}", file=sys.stderr)
-            print(f"[Interactive Viewer] Expires in {expire_minutes} minutes", file=sys.stderr)
-            
-            return {
-                'viewerId': viewer_id,
-                'htmlPath': output_html,
-                'expiresAt': expiration.isoformat(),
-                'urlPath': f'/api/docking/viewer/{viewer_id}'
-            }
-            
-        except Exception as e:
-            print(f"[Interactive Viewer Error] {str(e)}", file=sys.stderr)
-            import traceback
-            traceback.print_exc(file=sys.stderr)
-            return {}
-    
-    def _generate_html_content(self, view_type: str, width: int, height: int, viewer_id: str) -> str:
-        """
-        Generate HTML content with embedded 3D viewer
-        
-        Args:
-            view_type: Type of visualization
-            width: Viewer width
-            height: Viewer height
-            viewer_id: Unique viewer identifier
-        
-        Returns:
-            Complete HTML document as string
-        """
-        # Escape PDB content for JavaScript
-        pdb_escaped = self.pdb_content.replace('\\', '\\\\').replace('`', '\\`').replace('$', '\\$')
-        
-        # Style configuration based on view type
-        styles = self._get_view_styles(view_type)
-        
-        html = f"""<!DOCTYPE html>
+# The viewer page is static except for the embedded PDB payload, so the
+# whole document is built once at import time. A sentinel marks the
+# payload hole: one str.replace fills it per viewer, and unlike
+# str.format or string.Template the CSS braces and the JS "$3Dmol"
+# references need no escaping or doubling. The payload is gzip+base64
+# and decompressed in the browser, so it is 7-bit safe by construction.
+_PDB_SENTINEL = '__PDB_B64__'
+
+_HTML_TEMPLATE_RAW = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -119,142 +37,142 @@ class InteractiveMolecularViewer:
     <title>Protein-Ligand Complex Viewer</title>
     <script src="https://3Dmol.csb.pitt.edu/build/3Dmol-min.js"></script>
     <style>
-        * {{
+        * {
             box-sizing: border-box;
-        }}
-        body {{
+        }
+        body {
             margin: 0;
             padding: 0;
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             min-height: 100vh;
-        }}
-        .container {{
+        }
+        .container {
             width: 100%;
             height: 100vh;
             margin: 0;
             background: white;
             display: flex;
             flex-direction: column;
-        }}
-        .header {{
+        }
+        .header {
             background: linear-gradient(135deg, #2c3e50 0%, #34495e 100%);
             color: white;
             padding: 12px 15px;
             text-align: center;
             flex-shrink: 0;
-        }}
-        .header h1 {{
+        }
+        .header h1 {
             margin: 0;
             font-size: 18px;
             font-weight: 600;
-        }}
-        .header p {{
+        }
+        .header p {
             margin: 4px 0 0 0;
             opacity: 0.9;
             font-size: 12px;
-        }}
-        #viewer {{
+        }
+        #viewer {
             flex: 1;
             width: 100%;
             min-height: 0;
             background: #f5f5f5;
             position: relative;
-        }}
-        .controls {{
+        }
+        .controls {
             padding: 12px 15px;
             background: #f8f9fa;
             border-top: 1px solid #e0e0e0;
             flex-shrink: 0;
             max-height: 40vh;
             overflow-y: auto;
-        }}
-        .control-group {{
+        }
+        .control-group {
             margin-bottom: 12px;
-        }}
-        .control-group:last-child {{
+        }
+        .control-group:last-child {
             margin-bottom: 0;
-        }}
-        .control-group label {{
+        }
+        .control-group label {
             display: block;
             margin-bottom: 5px;
             font-weight: 600;
             color: #333;
             font-size: 12px;
-        }}
-        select, button {{
+        }
+        select, button {
             padding: 8px 12px;
             border: 1px solid #ddd;
             border-radius: 6px;
             font-size: 13px;
             cursor: pointer;
             transition: all 0.3s;
-        }}
-        select {{
+        }
+        select {
             width: 100%;
             background: white;
-        }}
-        select:hover {{
+        }
+        select:hover {
             border-color: #667eea;
-        }}
-        .button-group {{
+        }
+        .button-group {
             display: grid;
             grid-template-columns: repeat(2, 1fr);
             gap: 8px;
-        }}
-        button {{
+        }
+        button {
             background: #667eea;
             color: white;
             border: none;
             font-weight: 500;
             width: 100%;
-        }}
-        button:hover {{
+        }
+        button:hover {
             background: #5568d3;
-        }}
-        button:active {{
+        }
+        button:active {
             transform: scale(0.98);
-        }}
-        .info {{
+        }
+        .info {
             padding: 10px 15px;
             background: #e8f4f8;
             border-top: 1px solid #b3dde6;
             font-size: 11px;
             color: #2c5f77;
             flex-shrink: 0;
-        }}
-        .info strong {{
+        }
+        .info strong {
             color: #1a3d4d;
-        }}
-        .legend {{
+        }
+        .legend {
             padding: 12px 15px;
             background: white;
             border-top: 1px solid #e0e0e0;
             flex-shrink: 0;
-        }}
-        .legend h3 {{
+        }
+        .legend h3 {
             margin: 0 0 8px 0;
             font-size: 14px;
             color: #333;
-        }}
-        .legend-items {{
+        }
+        .legend-items {
             display: flex;
             gap: 12px;
             flex-wrap: wrap;
-        }}
-        .legend-item {{
+        }
+        .legend-item {
             display: flex;
             align-items: center;
             gap: 6px;
             font-size: 11px;
-        }}
-        .legend-color {{
+        }
+        .legend-color {
             width: 16px;
             height: 16px;
             border-radius: 3px;
             border: 1px solid #ddd;
-        }}
-        .loading {{
+        }
+        .loading {
             position: absolute;
             top: 50%;
             left: 50%;
@@ -262,59 +180,59 @@ class InteractiveMolecularViewer:
             font-size: 14px;
             color: #667eea;
             font-weight: 500;
-        }}
+        }
         
         /* Desktop styles */
-        @media (min-width: 768px) {{
-            body {{
+        @media (min-width: 768px) {
+            body {
                 padding: 20px;
-            }}
-            .container {{
+            }
+            .container {
                 max-width: 1200px;
                 margin: 0 auto;
                 height: auto;
                 min-height: 90vh;
                 border-radius: 12px;
                 box-shadow: 0 20px 60px rgba(0,0,0,0.3);
-            }}
-            .header h1 {{
+            }
+            .header h1 {
                 font-size: 24px;
-            }}
-            .header p {{
+            }
+            .header p {
                 font-size: 14px;
-            }}
-            #viewer {{
+            }
+            #viewer {
                 height: 600px;
-            }}
-            .controls {{
+            }
+            .controls {
                 padding: 20px 30px;
                 max-height: none;
-            }}
-            .button-group {{
+            }
+            .button-group {
                 grid-template-columns: repeat(4, 1fr);
                 gap: 10px;
-            }}
-            .legend {{
+            }
+            .legend {
                 padding: 20px 30px;
-            }}
-            .legend h3 {{
+            }
+            .legend h3 {
                 font-size: 16px;
-            }}
-            .legend-items {{
+            }
+            .legend-items {
                 gap: 20px;
-            }}
-            .legend-item {{
+            }
+            .legend-item {
                 font-size: 13px;
-            }}
-            .legend-color {{
+            }
+            .legend-color {
                 width: 20px;
                 height: 20px;
-            }}
-            .info {{
+            }
+            .info {
                 font-size: 13px;
                 padding: 15px 30px;
-            }}
-        }}
+            }
+        }
     </style>
 </head>
 <body>
@@ -379,16 +297,26 @@ class InteractiveMolecularViewer:
     <script>
         let viewer;
         let spinning = false;
-        const pdbData = `{pdb_escaped}`;
-        
+        let ligandSel;
+        let ligandAtoms;
+        const pdbB64 = "__PDB_B64__";
+
         // Initialize 3Dmol viewer
-        function initViewer() {{
+        async function initViewer() {
             const element = document.getElementById('viewer');
-            const config = {{ backgroundColor: 'white' }};
+            const config = { backgroundColor: 'white' };
             viewer = $3Dmol.createViewer(element, config);
-            
-            // Load PDB structure
+
+            // Decompress the gzip+base64 PDB payload, then load it
+            const bytes = Uint8Array.from(atob(pdbB64), c => c.charCodeAt(0));
+            const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+            const pdbData = await new Response(stream).text();
             viewer.addModel(pdbData, 'pdb');
+
+            // Select the ligand once; style switches reuse this instead
+            // of re-scanning every atom in the model
+            ligandSel = {hetflag: true};
+            ligandAtoms = viewer.selectedAtoms(ligandSel);
             
             // Apply initial style
             applyPublicationStyle();
@@ -400,104 +328,103 @@ class InteractiveMolecularViewer:
             document.getElementById('loading').style.display = 'none';
             
             console.log('3Dmol viewer initialized successfully');
-        }}
+        }
         
-        function applyPublicationStyle() {{
-            viewer.setStyle({{}}, {{ }});  // Clear all styles
+        function applyPublicationStyle() {
+            viewer.setStyle({}, { });  // Clear all styles
             
             // Protein backbone - cartoon
             viewer.setStyle(
-                {{not: {{hetflag: true}}}},
-                {{cartoon: {{color: 'cyan', opacity: 0.7}}}}
+                {not: {hetflag: true}},
+                {cartoon: {color: 'cyan', opacity: 0.7}}
             );
             
             // Ligand - stick representation
             viewer.setStyle(
-                {{hetflag: true}},
-                {{stick: {{colorscheme: 'orangeCarbon', radius: 0.3}}}}
+                {hetflag: true},
+                {stick: {colorscheme: 'orangeCarbon', radius: 0.3}}
             );
             
             viewer.render();
-        }}
+        }
         
-        function applyBindingSiteStyle() {{
-            viewer.setStyle({{}}, {{ }});
+        function applyBindingSiteStyle() {
+            viewer.setStyle({}, { });
             
             // Ligand - prominent display
             viewer.setStyle(
-                {{hetflag: true}},
-                {{stick: {{colorscheme: 'orangeCarbon', radius: 0.4}}, sphere: {{scale: 0.3}}}}
+                {hetflag: true},
+                {stick: {colorscheme: 'orangeCarbon', radius: 0.4}, sphere: {scale: 0.3}}
             );
             
-            // Nearby residues (within 5Å)
-            const ligandAtoms = viewer.selectedAtoms({{hetflag: true}});
-            if (ligandAtoms.length > 0) {{
+            // Nearby residues (within 5Å) - reuses the cached selection
+            if (ligandAtoms.length > 0) {
                 viewer.setStyle(
-                    {{not: {{hetflag: true}}, withinDistance: {{distance: 5, sel: {{hetflag: true}}}}}},
-                    {{stick: {{colorscheme: 'greenCarbon', radius: 0.25}}}}
+                    {not: {hetflag: true}, withinDistance: {distance: 5, sel: ligandSel}},
+                    {stick: {colorscheme: 'greenCarbon', radius: 0.25}}
                 );
-            }}
-            
-            viewer.zoomTo({{hetflag: true}});
+            }
+
+            viewer.zoomTo(ligandSel);
             viewer.render();
-        }}
+        }
         
-        function applySurfaceStyle() {{
-            viewer.setStyle({{}}, {{ }});
+        function applySurfaceStyle() {
+            viewer.setStyle({}, { });
             
             // Protein surface
             viewer.addSurface(
                 $3Dmol.SurfaceType.VDW,
-                {{opacity: 0.7, color: 'lightblue'}},
-                {{not: {{hetflag: true}}}}
+                {opacity: 0.7, color: 'lightblue'},
+                {not: {hetflag: true}}
             );
             
             // Ligand as spheres
             viewer.setStyle(
-                {{hetflag: true}},
-                {{sphere: {{colorscheme: 'orangeCarbon', scale: 0.6}}}}
+                {hetflag: true},
+                {sphere: {colorscheme: 'orangeCarbon', scale: 0.6}}
             );
             
             viewer.render();
-        }}
+        }
         
-        function applyCartoonStyle() {{
-            viewer.setStyle({{}}, {{ }});
+        function applyCartoonStyle() {
+            viewer.setStyle({}, { });
             
             viewer.setStyle(
-                {{not: {{hetflag: true}}}},
-                {{cartoon: {{color: 'spectrum'}}}}
+                {not: {hetflag: true}},
+                {cartoon: {color: 'spectrum'}}
             );
             
             viewer.setStyle(
-                {{hetflag: true}},
-                {{stick: {{colorscheme: 'default'}}}}
+                {hetflag: true},
+                {stick: {colorscheme: 'default'}}
             );
             
             viewer.render();
-        }}
+        }
         
-        function applyDetailedStyle() {{
-            viewer.setStyle({{}}, {{ }});
+        function applyDetailedStyle() {
+            viewer.setStyle({}, { });
             
             // Show all atoms as sticks
             viewer.setStyle(
-                {{not: {{hetflag: true}}}},
-                {{stick: {{colorscheme: 'chainHetatm', radius: 0.15}}}}
+                {not: {hetflag: true}},
+                {stick: {colorscheme: 'chainHetatm', radius: 0.15}}
             );
             
             viewer.setStyle(
-                {{hetflag: true}},
-                {{stick: {{colorscheme: 'orangeCarbon', radius: 0.3}}, sphere: {{scale: 0.25}}}}
+                {hetflag: true},
+                {stick: {colorscheme: 'orangeCarbon', radius: 0.3}, sphere: {scale: 0.25}}
             );
             
             viewer.render();
-        }}
+        }
         
-        function changeStyle() {{
+        function changeStyle() {
             const style = document.getElementById('styleSelector').value;
             
-            switch(style) {{
+            switch(style) {
                 case 'publication':
                     applyPublicationStyle();
                     break;
@@ -513,39 +440,224 @@ class InteractiveMolecularViewer:
                 case 'detailed':
                     applyDetailedStyle();
                     break;
-            }}
-        }}
+            }
+        }
         
-        function resetView() {{
+        function resetView() {
             viewer.zoomTo();
             viewer.render();
-        }}
+        }
         
-        function toggleSpin() {{
+        function toggleSpin() {
             spinning = !spinning;
-            if (spinning) {{
+            if (spinning) {
                 viewer.spin(true);
-            }} else {{
+            } else {
                 viewer.spin(false);
-            }}
-        }}
+            }
+        }
         
-        function zoomToLigand() {{
-            viewer.zoomTo({{hetflag: true}});
+        function zoomToLigand() {
+            viewer.zoomTo(ligandSel);
             viewer.render();
-        }}
+        }
         
-        function showBindingSite() {{
+        function showBindingSite() {
             document.getElementById('styleSelector').value = 'binding_site';
             applyBindingSiteStyle();
-        }}
+        }
         
         // Initialize when page loads
         window.addEventListener('load', initViewer);
     </script>
 </body>
 </html>"""
+
+
+def _minify_css(css: str) -> str:
+    """Collapse whitespace and drop comments from a CSS block."""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};:,])\s*', r'\1', css)
+    return css.strip()
+
+
+def _minify_js(js: str) -> str:
+    """
+    Conservatively minify a JS block: drop blank lines, full-line //
+    comments and leading indentation. No statement rewriting, so the
+    code stays debuggable in browser devtools.
+    """
+    kept = []
+    for line in js.splitlines():
+        line = line.strip()
+        if line and not line.startswith('//'):
+            kept.append(line)
+    return '\n'.join(kept)
+
+
+def _minify_template(html: str) -> str:
+    """Minify the inline <style> and <script> blocks of the raw page."""
+    html = re.sub(r'(?<=<style>).*?(?=</style>)',
+                  lambda m: _minify_css(m.group(0)), html, flags=re.S)
+    # Only the bare inline <script> block; the CDN tag has a src attribute
+    html = re.sub(r'(?<=<script>).*?(?=</script>)',
+                  lambda m: _minify_js(m.group(0)), html, flags=re.S)
+    return html
+
+
+# Minified once at import: every viewer write ships the same CSS/JS, so
+# the per-call cost is just the payload substitution below
+_HTML_TEMPLATE = _minify_template(_HTML_TEMPLATE_RAW)
+
+# Style configuration per view type, built once and shared read-only
+# across every viewer instead of reallocating the nested dicts per call
+_VIEW_STYLES = MappingProxyType({
+    'publication': {
+        'protein': 'cartoon',
+        'ligand': 'stick',
+        'colors': {'protein': 'cyan', 'ligand': 'orange'}
+    },
+    'binding_site': {
+        'protein': 'stick',
+        'ligand': 'stick+sphere',
+        'show_nearby': True,
+        'distance': 5.0
+    },
+    'surface': {
+        'protein': 'surface',
+        'ligand': 'sphere',
+        'surface_opacity': 0.7
+    },
+    'all': {
+        'include_all': True
+    }
+})
+
+
+class InteractiveMolecularViewer:
+    """
+    Generate interactive 3D molecular visualizations using py3Dmol
+    Creates temporary HTML files that auto-expire
+    """
+    
+    # Store active viewers with expiration times. Expirations are
+    # time.monotonic() floats (immune to wall-clock jumps) and a heap
+    # of (expire_ts, viewer_id) lets cleanup pop only the expired
+    # heads instead of scanning every entry
+    _active_viewers = {}
+    _expiry_heap = []
+    # Guards _active_viewers and _expiry_heap: registration, expiry
+    # sweeps and forced cleanup can run from concurrent server threads
+    _lock = threading.RLock()
+    
+    def __init__(self, complex_pdb_path: str, pdb_content: Optional[str] = None):
+        """
+        Initialize viewer with complex PDB file
+
+        Args:
+            complex_pdb_path: Path to PDB file containing protein and ligand
+            pdb_content: Already-loaded PDB text; skips the file read when
+                the same complex feeds several viewers (see load_complex)
+        """
+        self.complex_pdb = complex_pdb_path
+
+        # Read PDB content unless the caller preloaded it
+        if pdb_content is None:
+            with open(complex_pdb_path, 'r') as f:
+                pdb_content = f.read()
+        self.pdb_content = pdb_content
+
+        print(f"[Interactive Viewer] Loaded complex: {complex_pdb_path}", file=sys.stderr)
+    
+    def generate_interactive_html(self, 
+                                  output_html: str,
+                                  view_type: str = 'publication',
+                                  width: int = 800,
+                                  height: int = 600,
+                                  expire_minutes: int = 30,
+                                  viewer_id: Optional[str] = None) -> Dict[str, str]:
+        """
+        Generate interactive HTML viewer using py3Dmol
+
+        Args:
+            output_html: Path to save HTML file
+            view_type: Type of view ('publication', 'binding_site', 'surface', 'all')
+            width: Viewer width in pixels
+            height: Viewer height in pixels
+            expire_minutes: Minutes before file auto-expires
+            viewer_id: Caller-supplied viewer ID; generated when omitted.
+                Passing the ID used to name output_html keeps the tracked
+                ID and the file name in sync for force_cleanup
+
+        Returns:
+            Dictionary with file path and viewer ID
+        """
+        try:
+            if viewer_id is None:
+                viewer_id = str(uuid.uuid4())
+
+            # Generate HTML with embedded py3Dmol viewer
+            html_content = self._generate_html_content(view_type, width, height, viewer_id)
+            
+            # Write HTML file
+            with open(output_html, 'w', encoding='utf-8') as f:
+                f.write(html_content)
+            
+            # Register for auto-cleanup
+            expiration = time.monotonic() + expire_minutes * 60
+            with self._lock:
+                self._active_viewers[viewer_id] = {
+                    'file_path': output_html,
+                    'expiration': expiration,
+                    'created': time.monotonic()
+                }
+                heapq.heappush(self._expiry_heap, (expiration, viewer_id))
+            
+            print(f"[Interactive Viewer] Created viewer: {output_html}", file=sys.stderr)
+            print(f"[Interactive Viewer] Expires in {expire_minutes} minutes", file=sys.stderr)
+            
+            # Wall-clock ISO string only for the API response
+            expires_at = datetime.now() + timedelta(minutes=expire_minutes)
+            return {
+                'viewerId': viewer_id,
+                'htmlPath': output_html,
+                'expiresAt': expires_at.isoformat(),
+                'urlPath': f'/api/docking/viewer/{viewer_id}'
+            }
+            
+        except Exception as e:
+            print(f"[Interactive Viewer Error] {str(e)}", file=sys.stderr)
+            import traceback
+            traceback.print_exc(file=sys.stderr)
+            return {}
+    
+    def _generate_html_content(self, view_type: str, width: int, height: int, viewer_id: str) -> str:
+        """
+        Generate HTML content with embedded 3D viewer
+        
+        Args:
+            view_type: Type of visualization
+            width: Viewer width
+            height: Viewer height
+            viewer_id: Unique viewer identifier
         
+        Returns:
+            Complete HTML document as string
+        """
+        # Embed the PDB as gzip+base64: fixed-width records compress
+        # 5-10x, shrinking the written HTML and the transfer to the
+        # browser, which inflates it with DecompressionStream. Base64
+        # is 7-bit safe, so no JS escaping is needed
+        pdb_b64 = base64.b64encode(
+            gzip.compress(self.pdb_content.encode('ascii', errors='replace'), 6)
+        ).decode('ascii')
+
+        # Style configuration based on view type
+        styles = self._get_view_styles(view_type)
+
+        html = _HTML_TEMPLATE.replace(_PDB_SENTINEL, pdb_b64)
+
         return html
     
     def _get_view_styles(self, view_type: str) -> Dict:
@@ -556,31 +668,9 @@ class InteractiveMolecularViewer:
             view_type: Type of view
         
         Returns:
-            Dictionary with style parameters
+            Dictionary with style parameters (read-only view)
         """
-        styles = {
-            'publication': {
-                'protein': 'cartoon',
-                'ligand': 'stick',
-                'colors': {'protein': 'cyan', 'ligand': 'orange'}
-            },
-            'binding_site': {
-                'protein': 'stick',
-                'ligand': 'stick+sphere',
-                'show_nearby': True,
-                'distance': 5.0
-            },
-            'surface': {
-                'protein': 'surface',
-                'ligand': 'sphere',
-                'surface_opacity': 0.7
-            },
-            'all': {
-                'include_all': True
-            }
-        }
-        
-        return styles.get(view_type, styles['publication'])
+        return _VIEW_STYLES.get(view_type, _VIEW_STYLES['publication'])
     
     @classmethod
     def cleanup_expired_viewers(cls):
@@ -588,26 +678,30 @@ class InteractiveMolecularViewer:
         Clean up expired viewer files
         Should be called periodically
         """
-        now = datetime.now()
-        expired_ids = []
-        
-        for viewer_id, info in cls._active_viewers.items():
-            if now > info['expiration']:
-                try:
-                    file_path = Path(info['file_path'])
-                    if file_path.exists():
-                        file_path.unlink()
-                        print(f"[Cleanup] Deleted expired viewer: {file_path}", file=sys.stderr)
-                    expired_ids.append(viewer_id)
-                except Exception as e:
-                    print(f"[Cleanup Error] {str(e)}", file=sys.stderr)
-        
-        # Remove from tracking
-        for viewer_id in expired_ids:
-            del cls._active_viewers[viewer_id]
-        
-        if expired_ids:
-            print(f"[Cleanup] Removed {len(expired_ids)} expired viewers", file=sys.stderr)
+        now = time.monotonic()
+
+        # Only the expired heads of the heap are touched; entries for
+        # viewers already removed by force_cleanup are skipped. Registry
+        # updates happen under the lock, file deletion outside it
+        expired = []
+        with cls._lock:
+            while cls._expiry_heap and cls._expiry_heap[0][0] <= now:
+                _, viewer_id = heapq.heappop(cls._expiry_heap)
+                info = cls._active_viewers.pop(viewer_id, None)
+                if info is not None:
+                    expired.append(info['file_path'])
+
+        for file_path in expired:
+            try:
+                file_path = Path(file_path)
+                if file_path.exists():
+                    file_path.unlink()
+                    print(f"[Cleanup] Deleted expired viewer: {file_path}", file=sys.stderr)
+            except Exception as e:
+                print(f"[Cleanup Error] {str(e)}", file=sys.stderr)
+
+        if expired:
+            print(f"[Cleanup] Removed {len(expired)} expired viewers", file=sys.stderr)
     
     @classmethod
     def force_cleanup(cls, viewer_id: str):
@@ -617,45 +711,127 @@ class InteractiveMolecularViewer:
         Args:
             viewer_id: ID of viewer to cleanup
         """
-        if viewer_id in cls._active_viewers:
-            info = cls._active_viewers[viewer_id]
+        with cls._lock:
+            info = cls._active_viewers.pop(viewer_id, None)
+        if info is not None:
             try:
                 file_path = Path(info['file_path'])
                 if file_path.exists():
                     file_path.unlink()
                     print(f"[Force Cleanup] Deleted viewer: {file_path}", file=sys.stderr)
-                del cls._active_viewers[viewer_id]
             except Exception as e:
                 print(f"[Force Cleanup Error] {str(e)}", file=sys.stderr)
 
 
-def generate_interactive_viewer(complex_pdb_path: str, 
+# Background directory sweepers, one daemon thread per output directory.
+# The in-process registry above only sees viewers created by this
+# process; in a multi-process deployment each worker leaves files the
+# others never sweep. The sweeper works from the filesystem instead,
+# unlinking viewer_* files whose st_mtime is older than the TTL, so
+# stale files are reclaimed regardless of which process wrote them.
+_SWEEP_INTERVAL_SECONDS = 60
+
+_sweepers = {}
+_sweepers_lock = threading.Lock()
+
+
+def _sweep_directory(output_dir: str, ttl: dict):
+    """
+    Periodically unlink expired viewer files in output_dir
+
+    Args:
+        output_dir: Directory holding viewer_*.html files
+        ttl: Single-entry dict {'seconds': float}; mutable so later
+            callers with a longer expire_minutes can extend it
+    """
+    while True:
+        time.sleep(_SWEEP_INTERVAL_SECONDS)
+        now = time.time()
+        try:
+            with os.scandir(output_dir) as entries:
+                for entry in entries:
+                    if not entry.name.startswith('viewer_'):
+                        continue
+                    try:
+                        if now - entry.stat().st_mtime > ttl['seconds']:
+                            os.unlink(entry.path)
+                            print(f"[Sweeper] Deleted expired viewer: {entry.path}", file=sys.stderr)
+                    except OSError:
+                        pass
+        except OSError:
+            # Directory removed; stop sweeping it
+            with _sweepers_lock:
+                _sweepers.pop(output_dir, None)
+            return
+
+
+def _ensure_sweeper(output_dir: str, expire_minutes: int):
+    """
+    Start (or retune) the background sweeper for output_dir
+
+    Args:
+        output_dir: Directory to sweep
+        expire_minutes: Viewer lifetime; the sweeper keeps the longest
+            lifetime requested for the directory
+    """
+    ttl_seconds = expire_minutes * 60
+    with _sweepers_lock:
+        ttl = _sweepers.get(output_dir)
+        if ttl is not None:
+            ttl['seconds'] = max(ttl['seconds'], ttl_seconds)
+            return
+        ttl = {'seconds': ttl_seconds}
+        _sweepers[output_dir] = ttl
+    thread = threading.Thread(target=_sweep_directory, args=(output_dir, ttl), daemon=True)
+    thread.start()
+
+
+def load_complex(complex_pdb_path: str) -> str:
+    """
+    Read a complex PDB once for reuse across several viewers
+
+    Args:
+        complex_pdb_path: Path to complex PDB file
+
+    Returns:
+        PDB file content, suitable for the pdb_content arguments below
+    """
+    with open(complex_pdb_path, 'r') as f:
+        return f.read()
+
+
+def generate_interactive_viewer(complex_pdb_path: str,
                                 output_dir: str,
                                 view_type: str = 'publication',
-                                expire_minutes: int = 30) -> Dict[str, str]:
+                                expire_minutes: int = 30,
+                                pdb_content: Optional[str] = None) -> Dict[str, str]:
     """
     Standalone function to generate interactive viewer
-    
+
     Args:
         complex_pdb_path: Path to complex PDB file
         output_dir: Directory to save HTML file
         view_type: Type of view
         expire_minutes: Minutes before auto-expiration
-    
+        pdb_content: Preloaded PDB text (avoids re-reading the file when
+            generating multiple views of the same complex)
+
     Returns:
         Dictionary with viewer information
     """
     try:
         os.makedirs(output_dir, exist_ok=True)
-        
-        viewer = InteractiveMolecularViewer(complex_pdb_path)
+        _ensure_sweeper(output_dir, expire_minutes)
+
+        viewer = InteractiveMolecularViewer(complex_pdb_path, pdb_content=pdb_content)
         viewer_id = str(uuid.uuid4())
         output_html = os.path.join(output_dir, f'viewer_{viewer_id}.html')
         
         result = viewer.generate_interactive_html(
-            output_html, 
+            output_html,
             view_type=view_type,
-            expire_minutes=expire_minutes
+            expire_minutes=expire_minutes,
+            viewer_id=viewer_id
         )
         
         return result